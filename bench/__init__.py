@@ -0,0 +1,4 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
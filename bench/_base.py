@@ -0,0 +1,180 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import typing as t
+from dataclasses import dataclass
+from pathlib import Path
+
+from es7s_commons.common import median
+
+ROOT_PATH = Path(__file__).parent.parent
+BASELINES_PATH = Path(__file__).parent / "baselines"
+
+DEFAULT_THRESHOLD = 0.25
+""" Max allowed relative slowdown before the result is considered a regression. """
+
+
+@dataclass
+class BenchResult:
+    name: str
+    value: float
+    unit: str = "ns"
+    baseline: float | None = None
+    failed: bool = False
+    missing: bool = False
+    error: str | None = None
+
+    @property
+    def ratio(self) -> float | None:
+        if not self.baseline:
+            return None
+        return self.value / self.baseline
+
+    def format(self) -> str:
+        ratio = "" if self.ratio is None else f"{100*(self.ratio - 1):+6.1f}%"
+        value = _format_ns(self.value) if self.unit == "ns" else f"{self.value:.0f}{self.unit}"
+        state = "FAIL" if self.failed else "ok"
+        result = f"{state:<4s} {self.name:<40s} {value:>9s} {ratio:>8s}"
+        if self.missing:
+            result += " no baseline, run with --update"
+        return result
+
+
+class BenchSuite:
+    """
+    Collection of named measurements stored as a JSON baseline in
+    :data:`BASELINES_PATH`. A measurement is a regression if it exceeds
+    the baseline value by more than ``threshold`` (relative).
+    """
+
+    def __init__(self, name: str, threshold: float = DEFAULT_THRESHOLD):
+        self._name = name
+        self._threshold = threshold
+        self._results: dict[str, BenchResult] = {}
+        self._baseline: dict[str, dict] = self._read_baseline()
+
+    @property
+    def baseline_path(self) -> Path:
+        return BASELINES_PATH / f"{self._name}.json"
+
+    def add(self, name: str, value: float, unit: str = "ns", *, compare=True) -> BenchResult:
+        result = BenchResult(name, value, unit)
+        if compare and (baseline := self._baseline.get(name)):
+            result.baseline = baseline["value"]
+            result.failed = result.ratio > 1 + self._threshold
+        elif compare:
+            result.failed = result.missing = True
+        self._results[name] = result
+        print(result.format(), file=sys.stderr)
+        return result
+
+    def fail(self, name: str, reason: str):
+        self._results[name] = BenchResult(name, 0, failed=True, error=reason)
+        print(f"FAIL {name:<40s} {reason}", file=sys.stderr)
+
+    @property
+    def failed(self) -> list[BenchResult]:
+        return [r for r in self._results.values() if r.failed]
+
+    def write_baseline(self):
+        data = {k: dict(value=r.value, unit=r.unit) for k, r in self._results.items() if r.value}
+        self.baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        self.baseline_path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written: {self.baseline_path}", file=sys.stderr)
+
+    def finalize(self, update: bool) -> int:
+        """
+        Report the failures and write the baseline if ``update`` is set. The
+        baseline is never written if any of the checks failed; regressions
+        are written, but still result in non-zero exit code.
+        """
+        if errors := [r for r in self.failed if r.error]:
+            print(f"{len(errors)} check(s) failed", file=sys.stderr)
+            if update:
+                print("Baseline not written", file=sys.stderr)
+            return 1
+        regressed = [r for r in self.failed if not r.missing]
+        if update:
+            self.write_baseline()
+        elif not self._baseline:
+            print("No baseline found, run with --update to create one", file=sys.stderr)
+            return 1
+        elif missing := [r for r in self.failed if r.missing]:
+            print(f"{len(missing)} measurement(s) missing from the baseline", file=sys.stderr)
+        if regressed:
+            print(
+                f"{len(regressed)} regression(s) above {100*self._threshold:.0f}%", file=sys.stderr
+            )
+        return 1 if regressed or (self.failed and not update) else 0
+
+    def _read_baseline(self) -> dict[str, dict]:
+        if not self.baseline_path.exists():
+            return {}
+        return json.loads(self.baseline_path.read_text())
+
+
+def _format_ns(val: float) -> str:
+    for divisor, unit in [(1e9, "s"), (1e6, "ms"), (1e3, "µs")]:
+        if val >= 2 * divisor:
+            return f"{val/divisor:.{1 if unit == 's' else 0}f}{unit}"
+    return f"{val:.0f}ns"
+
+
+def run_isolated(code: str, repeats: int) -> float:
+    """
+    Execute ``code`` in ``repeats`` fresh interpreters and return the median of
+    the integers printed by each run (the snippet is expected to print exactly
+    one -- elapsed time in nanoseconds).
+    """
+    env = dict(os.environ, PYTHONPATH=str(ROOT_PATH))
+    values = []
+    for _ in range(repeats):
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT_PATH,
+            env=env,
+            capture_output=True,
+            encoding="utf8",
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+        values.append(int(proc.stdout.strip().splitlines()[-1]))
+    return median(sorted(values))
+
+
+def make_arg_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "-u", "--update", action="store_true", help="Overwrite the baseline with current results."
+    )
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=float(os.environ.get("ES7S_BENCH_THRESHOLD", DEFAULT_THRESHOLD)),
+        help="Max allowed relative slowdown (default: %(default)s, env: ES7S_BENCH_THRESHOLD).",
+    )
+    parser.add_argument(
+        "-r", "--repeats", type=int, default=5, help="Runs per measurement (default: %(default)s)."
+    )
+    return parser
+
+
+def main(
+    fn: t.Callable[[argparse.Namespace], BenchSuite],
+    description: str,
+    configure: t.Callable[[argparse.ArgumentParser], None] = None,
+):
+    parser = make_arg_parser(description)
+    if configure:
+        configure(parser)
+    args = parser.parse_args()
+    sys.exit(fn(args).finalize(args.update))
@@ -0,0 +1,146 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
+"""
+Per-step overhead of progress reporting: `ProgressBar` (formatting on/off,
+writing to memory and to /dev/null) and `DummyProgressBar` driven through
+plain `next_step()` calls. The sinks claim to be terminals, so that frames
+are paced as on a real tty. Usage::
+
+    python -m bench.progress [--update] [--threshold 0.25] [--steps 10000 1000000]
+
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import time
+import tracemalloc
+import typing as t
+
+import pytermor as pt
+
+from es7s_commons.common import median
+from es7s_commons.progressbar import DummyProgressBar, ProgressBar
+
+from ._base import BenchSuite, main
+
+DEFAULT_STEPS = [10**4, 10**5, 10**6]
+TRACED_FRAMES = 200
+
+
+class _TtySink:
+    """Output stream pretending to be a terminal and counting bytes written."""
+
+    def __init__(self, target: t.IO):
+        self._target = target
+        self.written = 0
+
+    def write(self, s: str) -> int:
+        self.written += len(s.encode())
+        return self._target.write(s)
+
+    def flush(self):
+        self._target.flush()
+
+    def isatty(self) -> bool:
+        return True
+
+    def close(self):
+        self._target.close()
+
+
+def _make_sink(kind: str) -> _TtySink:
+    if kind == "devnull":
+        return _TtySink(open(os.devnull, "w"))
+    return _TtySink(io.StringIO())
+
+
+def _make_pbar(case: str, sink: _TtySink) -> ProgressBar | DummyProgressBar:
+    if case.startswith("dummy"):
+        return DummyProgressBar()
+    renderer = pt.SgrRenderer(pt.OutputMode.XTERM_256)
+    if case.startswith("pbar-nofmt"):
+        renderer = pt.NoopRenderer()
+    return ProgressBar(renderer, sink, pt.cv.BLUE, steps_amount=10**9)
+
+
+def _run_steps(case: str, steps: int) -> tuple[float, int | None, int]:
+    """:return: ns per step, frames rendered (if applicable), bytes written"""
+    sink = _make_sink(case.partition(":")[2])
+    pbar = _make_pbar(case, sink)
+    with contextlib.redirect_stderr(sink):  # DummyProgressBar writes there
+        t0 = time.perf_counter_ns()
+        for _ in range(steps):
+            pbar.next_step("step")
+        elapsed = time.perf_counter_ns() - t0
+    sink.close()
+    frames = pbar._governor.rendered_frames if isinstance(pbar, ProgressBar) else None
+    return elapsed / steps, frames, sink.written
+
+
+def _measure_frame_peak_bytes(case: str) -> float:
+    """
+    :return: Median peak of memory allocated while rendering a frame, in bytes
+             (tracemalloc tracks the size of the allocations, not their amount).
+    """
+    if case.startswith("dummy"):
+        return 0.0
+    sink = _make_sink(case.partition(":")[2])
+    pbar = _make_pbar(case, sink)
+    pbar.render()  # warm up the caches and the template
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(TRACED_FRAMES):
+            pbar.next_step("step", render=False)
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            pbar._render_frame(time.monotonic_ns())
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+        sink.close()
+    return median(sorted(peaks))
+
+
+CASES = [
+    "pbar-fmt:stringio",
+    "pbar-fmt:devnull",
+    "pbar-nofmt:stringio",
+    "pbar-nofmt:devnull",
+    "dummy:devnull",
+]
+
+
+def run(args: argparse.Namespace) -> BenchSuite:
+    suite = BenchSuite("progress", args.threshold)
+    for case in CASES:
+        for steps in args.steps:
+            runs = [_run_steps(case, steps) for _ in range(args.repeats)]
+            name = f"{case}:{steps:.0e}".replace("+0", "")
+            suite.add(f"{name}:step", median(sorted(r[0] for r in runs)))
+            if runs[0][1] is None:
+                continue
+            frames = median(sorted(r[1] for r in runs))
+            bytes_written = median(sorted(r[2] for r in runs))
+            suite.add(f"{name}:frames", frames, "fr", compare=False)
+            if frames:
+                suite.add(f"{name}:bytes/frame", bytes_written / frames, "B")
+        if peak_bytes := _measure_frame_peak_bytes(case):
+            suite.add(f"{case}:peak-bytes/frame", peak_bytes, "B")
+    return suite
+
+
+def _configure(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "-s", "--steps", type=int, nargs="+", default=DEFAULT_STEPS, help="Step amounts to run."
+    )
+    parser.set_defaults(repeats=3)
+
+
+if __name__ == "__main__":
+    main(run, __doc__, _configure)
@@ -0,0 +1,117 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
+"""
+Cold import time and first-call latency of the main entry points, each
+measured in a fresh interpreter. Usage::
+
+    python -m bench.startup [--update] [--threshold 0.25]
+
+"""
+from __future__ import annotations
+
+import argparse
+import textwrap
+
+from ._base import BenchSuite, main, run_isolated
+
+SUBMODULES = [
+    "asyncbar",
+    "column",
+    "common",
+    "gradient",
+    "multibar",
+    "plang",
+    "prof",
+    "progressbar",
+    "progresshub",
+    "pt_",
+    "rate",
+    "scale",
+    "separator",
+    "spinner",
+    "structx",
+    "strutil",
+    "termstate",
+    "totalsize",
+    "weather",
+]
+
+HEAVY_MODULES = [
+    "pytermor",
+    "es7s_commons.gradient",
+    "es7s_commons.plang",
+    "es7s_commons.progressbar",
+    "es7s_commons.weather",
+]
+""" Must not be loaded by plain ``import es7s_commons``. """
+
+_TIMER_TPL = """
+import time
+{setup}
+_t0 = time.perf_counter_ns()
+{stmt}
+print(time.perf_counter_ns() - _t0)
+"""
+
+# fmt: off
+FIRST_CALLS = {
+    "columns": (
+        "from es7s_commons import columns",
+        "columns(['item%d' % i for i in range(100)])",
+    ),
+    "Scale": (
+        "import pytermor as pt; from es7s_commons import Scale",
+        "pt.render(Scale(0.42, pt.NOOP_STYLE, pt.cv.BLUE),"
+        " renderer=pt.SgrRenderer(pt.OutputMode.TRUE_COLOR))",
+    ),
+    "ProgressBar.render": (
+        "import io, pytermor as pt; from es7s_commons import ProgressBar",
+        "ProgressBar(pt.SgrRenderer(pt.OutputMode.TRUE_COLOR), io.StringIO(), pt.cv.BLUE).render()",
+    ),
+    "PLangColor.find_by_name": (
+        "from es7s_commons import PLangColor",
+        "PLangColor.find_by_name('Python')",
+    ),
+    "get_wicon": (
+        "from es7s_commons import get_wicon",
+        "get_wicon('☀', 1)",
+    ),
+}
+# fmt: on
+
+
+def _make_code(setup: str, stmt: str) -> str:
+    return _TIMER_TPL.format(setup=setup, stmt=stmt)
+
+
+def _check_footprint(suite: BenchSuite):
+    code = textwrap.dedent(
+        f"""
+        import sys
+        import es7s_commons
+        print(sum(m in sys.modules for m in {HEAVY_MODULES!r}))
+        """
+    )
+    if loaded_count := run_isolated(code, repeats=1):
+        suite.fail("footprint", f"{loaded_count:.0f} heavy module(s) imported eagerly")
+
+
+def run(args: argparse.Namespace) -> BenchSuite:
+    suite = BenchSuite("startup", args.threshold)
+    _check_footprint(suite)
+
+    code = _make_code("", "import es7s_commons")
+    suite.add("import:es7s_commons", run_isolated(code, args.repeats))
+    for submodule in SUBMODULES:
+        code = _make_code("", f"import es7s_commons.{submodule}")
+        suite.add(f"import:{submodule}", run_isolated(code, args.repeats))
+
+    for name, (setup, stmt) in FIRST_CALLS.items():
+        suite.add(f"first-call:{name}", run_isolated(_make_code(setup, stmt), args.repeats))
+    return suite
+
+
+if __name__ == "__main__":
+    main(run, __doc__)
@@ -3,71 +3,202 @@
 #  (c) 2021-2023 A. Shavykin <0.delameter@gmail.com>
 # ------------------------------------------------------------------------------
 
+import importlib
+import typing as t
+
 from ._version import __updated__ as PKG_UPDATED  # noqa lower-cased variable bla-bla-bla
 from ._version import __version__ as PKG_VERSION  # noqa
-from .column import TextStat as TextStat
-from .column import columns as columns
-from .common import FinalSingleton as FinalSingleton
-from .common import Regex as Regex
-from .common import autogen as autogen
-from .common import bcs as bcs
-from .common import lcm as lcm
-from .common import logger as logger
-from .common import median as median
-from .common import now as now
-from .common import nowf as nowf
-from .common import percentile as percentile
-from .gradient import GimpGradientReader as GimpGradientReader
-from .gradient import Gradient as Gradient
-from .gradient import GradientPoint as GradientPoint
-from .gradient import GradientSegment as GradientSegment
-from .gradient import IGradientReader as IGradientReader
-from .gradient import deque_ext as deque_ext
-from .plang import PLangColor as PLangColor
-from .prof import measure as measure
-from .progressbar import DummyProgressBar as DummyProgressBar
-from .progressbar import ProgressBar as ProgressBar
-from .pt_ import AdaptiveFragment as AdaptiveFragment
-from .pt_ import CompositeCompressor as CompositeCompressor
-from .pt_ import DisposableComposite as DisposableComposite
-from .pt_ import format_attrs as format_attrs
-from .pt_ import format_path as format_path
-from .scale import FULL_BLOCK as FULL_BLOCK
-from .scale import Scale as Scale
-from .scale import get_partial_hblock as get_partial_hblock
-from .separator import FILE_SEPARATOR as FILE_SEPARATOR
-from .separator import GROUP_SEPARATOR as GROUP_SEPARATOR
-from .separator import RECORD_SEPARATOR as RECORD_SEPARATOR
-from .separator import SEPARATORS as SEPARATORS
-from .separator import UNIT_SEPARATOR as UNIT_SEPARATOR
-from .separator import get_separator as get_separator
-from .spinner import Spinner as Spinner
-from .spinner import SpinnerBrailleSquare as SpinnerBrailleSquare
-from .spinner import SpinnerBrailleSquareCenter as SpinnerBrailleSquareCenter
-from .spinner import SpinnerBrailleSquareFill as SpinnerBrailleSquareFill
-from .structx import DoublyLinkedNode as DoublyLinkedNode
-from .structx import RingList as RingList
-from .strutil import URL_REGEX as URL_REGEX
-from .strutil import NamedGroupsRefilter as NamedGroupsRefilter
-from .strutil import RegexValRefilter as RegexValRefilter
-from .strutil import SUBSCRIPT_TRANS as SUBSCRIPT_TRANS
-from .strutil import SUPERSCRIPT_TRANS as SUPERSCRIPT_TRANS
-from .strutil import Transmap as Transmap
-from .strutil import re_unescape as re_unescape
-from .strutil import to_subscript as to_subscript
-from .strutil import to_superscript as to_superscript
-from .termstate import InputMode as InputMode
-from .termstate import TerminalState as TerminalState
-from .termstate import terminal_state as terminal_state
-from .totalsize import total_size as total_size
-from .weather import DynamicIcon as DynamicIcon
-from .weather import WEATHER_ICON_SETS as WEATHER_ICON_SETS
-from .weather import WEATHER_ICON_TERMINATOR as WEATHER_ICON_TERMINATOR
-from .weather import WEATHER_SYMBOL_PLAIN as WEATHER_SYMBOL_PLAIN
-from .weather import WIND_DIRECTION as WIND_DIRECTION
-from .weather import WWO_CODE as WWO_CODE
-from .weather import WeatherIconSet as WeatherIconSet
-from .weather import get_wicon
-from .strutil import UCS_CYRILLIC as UCS_CYRILLIC
-from .strutil import UCS_CONTROL_CHARS as UCS_CONTROL_CHARS
-from .weather import justify_wicon
+
+if t.TYPE_CHECKING:
+    from .asyncbar import AsyncProgressBar as AsyncProgressBar
+    from .column import columns as columns
+    from .column import TextStat as TextStat
+    from .common import autogen as autogen
+    from .common import bcs as bcs
+    from .common import FinalSingleton as FinalSingleton
+    from .common import lcm as lcm
+    from .common import logger as logger
+    from .common import median as median
+    from .common import now as now
+    from .common import nowf as nowf
+    from .common import percentile as percentile
+    from .common import Regex as Regex
+    from .gradient import deque_ext as deque_ext
+    from .gradient import GimpGradientReader as GimpGradientReader
+    from .gradient import Gradient as Gradient
+    from .gradient import GradientPoint as GradientPoint
+    from .gradient import GradientSegment as GradientSegment
+    from .gradient import IGradientReader as IGradientReader
+    from .multibar import MultiProgressBar as MultiProgressBar
+    from .multibar import ProgressBarTask as ProgressBarTask
+    from .plang import PLangBreakdown as PLangBreakdown
+    from .plang import PLangClassifier as PLangClassifier
+    from .plang import PLangColor as PLangColor
+    from .plang import PLangColorGrid as PLangColorGrid
+    from .prof import measure as measure
+    from .progressbar import DummyProgressBar as DummyProgressBar
+    from .progressbar import JsonProgressBar as JsonProgressBar
+    from .progressbar import ProgressBar as ProgressBar
+    from .progresshub import ProgressHandle as ProgressHandle
+    from .progresshub import ProgressHub as ProgressHub
+    from .progresshub import SharedProgressHandle as SharedProgressHandle
+    from .progresshub import SharedProgressHub as SharedProgressHub
+    from .pt_ import AdaptiveFragment as AdaptiveFragment
+    from .pt_ import CompositeCompressor as CompositeCompressor
+    from .pt_ import CompressionSchedule as CompressionSchedule
+    from .pt_ import CompressionStep as CompressionStep
+    from .pt_ import DisposableComposite as DisposableComposite
+    from .pt_ import format_attrs as format_attrs
+    from .pt_ import format_path as format_path
+    from .rate import format_eta as format_eta
+    from .rate import format_rate as format_rate
+    from .rate import RateEstimator as RateEstimator
+    from .scale import FULL_BLOCK as FULL_BLOCK
+    from .scale import get_partial_hblock as get_partial_hblock
+    from .scale import Scale as Scale
+    from .separator import FILE_SEPARATOR as FILE_SEPARATOR
+    from .separator import get_separator as get_separator
+    from .separator import GROUP_SEPARATOR as GROUP_SEPARATOR
+    from .separator import RECORD_SEPARATOR as RECORD_SEPARATOR
+    from .separator import SEPARATORS as SEPARATORS
+    from .separator import UNIT_SEPARATOR as UNIT_SEPARATOR
+    from .spinner import Spinner as Spinner
+    from .spinner import SpinnerBrailleSquare as SpinnerBrailleSquare
+    from .spinner import SpinnerBrailleSquareCenter as SpinnerBrailleSquareCenter
+    from .spinner import SpinnerBrailleSquareFill as SpinnerBrailleSquareFill
+    from .structx import DoublyLinkedNode as DoublyLinkedNode
+    from .structx import RingList as RingList
+    from .strutil import NamedGroupsRefilter as NamedGroupsRefilter
+    from .strutil import re_unescape as re_unescape
+    from .strutil import RegexValRefilter as RegexValRefilter
+    from .strutil import SUBSCRIPT_TRANS as SUBSCRIPT_TRANS
+    from .strutil import SUPERSCRIPT_TRANS as SUPERSCRIPT_TRANS
+    from .strutil import to_subscript as to_subscript
+    from .strutil import to_superscript as to_superscript
+    from .strutil import Transmap as Transmap
+    from .strutil import UCS_CONTROL_CHARS as UCS_CONTROL_CHARS
+    from .strutil import UCS_CYRILLIC as UCS_CYRILLIC
+    from .strutil import URL_REGEX as URL_REGEX
+    from .termstate import get_terminal_geometry as get_terminal_geometry
+    from .termstate import get_terminal_width as get_terminal_width
+    from .termstate import InputMode as InputMode
+    from .termstate import terminal_state as terminal_state
+    from .termstate import TerminalGeometry as TerminalGeometry
+    from .termstate import TerminalState as TerminalState
+    from .totalsize import total_size as total_size
+    from .weather import DynamicIcon as DynamicIcon
+    from .weather import get_wicon as get_wicon
+    from .weather import justify_wicon as justify_wicon
+    from .weather import WEATHER_ICON_SETS as WEATHER_ICON_SETS
+    from .weather import WEATHER_ICON_TERMINATOR as WEATHER_ICON_TERMINATOR
+    from .weather import WEATHER_SYMBOL_PLAIN as WEATHER_SYMBOL_PLAIN
+    from .weather import WeatherIconSet as WeatherIconSet
+    from .weather import WIND_DIRECTION as WIND_DIRECTION
+    from .weather import WWO_CODE as WWO_CODE
+
+# Public names are resolved on first attribute access, so that e.g. ``logger``
+# does not drag in pytermor, the plang palette or the weather icon tables.
+# fmt: off
+_LAZY_ATTRS: dict[str, str] = {
+    "AsyncProgressBar":            "asyncbar",
+    "columns":                     "column",
+    "TextStat":                    "column",
+    "autogen":                     "common",
+    "bcs":                         "common",
+    "FinalSingleton":              "common",
+    "lcm":                         "common",
+    "logger":                      "common",
+    "median":                      "common",
+    "now":                         "common",
+    "nowf":                        "common",
+    "percentile":                  "common",
+    "Regex":                       "common",
+    "deque_ext":                   "gradient",
+    "GimpGradientReader":          "gradient",
+    "Gradient":                    "gradient",
+    "GradientPoint":               "gradient",
+    "GradientSegment":             "gradient",
+    "IGradientReader":             "gradient",
+    "MultiProgressBar":            "multibar",
+    "ProgressBarTask":             "multibar",
+    "PLangBreakdown":              "plang",
+    "PLangClassifier":             "plang",
+    "PLangColor":                  "plang",
+    "PLangColorGrid":              "plang",
+    "measure":                     "prof",
+    "DummyProgressBar":            "progressbar",
+    "JsonProgressBar":             "progressbar",
+    "ProgressBar":                 "progressbar",
+    "ProgressHandle":              "progresshub",
+    "ProgressHub":                 "progresshub",
+    "SharedProgressHandle":        "progresshub",
+    "SharedProgressHub":           "progresshub",
+    "AdaptiveFragment":            "pt_",
+    "CompositeCompressor":         "pt_",
+    "CompressionSchedule":         "pt_",
+    "CompressionStep":             "pt_",
+    "DisposableComposite":         "pt_",
+    "format_attrs":                "pt_",
+    "format_path":                 "pt_",
+    "format_eta":                  "rate",
+    "format_rate":                 "rate",
+    "RateEstimator":               "rate",
+    "FULL_BLOCK":                  "scale",
+    "get_partial_hblock":          "scale",
+    "Scale":                       "scale",
+    "FILE_SEPARATOR":              "separator",
+    "get_separator":               "separator",
+    "GROUP_SEPARATOR":             "separator",
+    "RECORD_SEPARATOR":            "separator",
+    "SEPARATORS":                  "separator",
+    "UNIT_SEPARATOR":              "separator",
+    "Spinner":                     "spinner",
+    "SpinnerBrailleSquare":        "spinner",
+    "SpinnerBrailleSquareCenter":  "spinner",
+    "SpinnerBrailleSquareFill":    "spinner",
+    "DoublyLinkedNode":            "structx",
+    "RingList":                    "structx",
+    "NamedGroupsRefilter":         "strutil",
+    "re_unescape":                 "strutil",
+    "RegexValRefilter":            "strutil",
+    "SUBSCRIPT_TRANS":             "strutil",
+    "SUPERSCRIPT_TRANS":           "strutil",
+    "to_subscript":                "strutil",
+    "to_superscript":              "strutil",
+    "Transmap":                    "strutil",
+    "UCS_CONTROL_CHARS":           "strutil",
+    "UCS_CYRILLIC":                "strutil",
+    "URL_REGEX":                   "strutil",
+    "get_terminal_geometry":       "termstate",
+    "get_terminal_width":          "termstate",
+    "InputMode":                   "termstate",
+    "terminal_state":              "termstate",
+    "TerminalGeometry":            "termstate",
+    "TerminalState":               "termstate",
+    "total_size":                  "totalsize",
+    "DynamicIcon":                 "weather",
+    "get_wicon":                   "weather",
+    "justify_wicon":               "weather",
+    "WEATHER_ICON_SETS":           "weather",
+    "WEATHER_ICON_TERMINATOR":     "weather",
+    "WEATHER_SYMBOL_PLAIN":        "weather",
+    "WeatherIconSet":              "weather",
+    "WIND_DIRECTION":              "weather",
+    "WWO_CODE":                    "weather",
+}
+# fmt: on
+
+__all__ = ["PKG_UPDATED", "PKG_VERSION", *_LAZY_ATTRS.keys()]
+
+
+def __getattr__(name: str) -> t.Any:
+    if (module_name := _LAZY_ATTRS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # next access won't even get here
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals().keys(), *__all__})
@@ -0,0 +1,120 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
+from __future__ import annotations
+
+import asyncio
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+
+import pytermor as pt
+
+from .common import logger
+from .progressbar import ProgressBar, _OutputBuffer
+
+_T = t.TypeVar("_T")
+
+
+class AsyncProgressBar(ProgressBar):
+    """
+    `ProgressBar` for event loop programs. The frames are composed by a loop
+    task at the current frame rate, and written to the output by a dedicated
+    thread, so that slow terminals and pipes never block the loop; if the
+    previous frame is still being written when the next one is due, the
+    latter is dropped. `next_task()`, `next_step()` and `atrack()` only update
+    the counters and labels.
+
+    >>> async with AsyncProgressBar(renderer, sys.stderr, pt.cv.BLUE) as pbar:
+    >>>     async for record in pbar.atrack(read_records(), steps_amount=total):
+    >>>         await process(record)
+    """
+
+    def __init__(self, renderer: pt.IRenderer, io: t.IO, theme_color: pt.Color, **kwargs):
+        if kwargs.get("background"):
+            raise ValueError("Frames are rendered by the loop task, background mode is unsupported")
+        super().__init__(renderer, io, theme_color, **kwargs)
+        self._target_io = io
+        self._io = _OutputBuffer()  # frames are composed in memory
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix=f"{pt.get_qname(self)}:writer")
+        self._render_task: asyncio.Task | None = None
+        self._pending_write: asyncio.Future | None = None
+
+    async def __aenter__(self) -> AsyncProgressBar:
+        self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    def start(self):
+        """Start the rendering task in the running event loop."""
+        if self._render_task is None:
+            self._render_task = asyncio.get_running_loop().create_task(self._render_loop())
+
+    async def atrack(
+        self,
+        aiterable: t.AsyncIterable[_T],
+        steps_amount: int = None,
+        step_label: str = None,
+    ) -> t.AsyncIterator[_T]:
+        """Yield the items of ``aiterable``, counting each one as a step."""
+        if steps_amount is not None:
+            self.init_steps(steps_amount)
+        async for item in aiterable:
+            self.next_step(step_label, render=False)
+            yield item
+
+    def render(self):
+        if self._render_task:
+            return  # frames are rendered by the loop task
+        super().render()
+        self._write(self._io.popvalue())
+
+    async def aclose(self):
+        try:
+            if render_task := self._render_task:
+                self._render_task = None
+                render_task.cancel()
+                try:
+                    await render_task
+                except asyncio.CancelledError:
+                    pass
+            if pending_write := self._pending_write:
+                self._pending_write = None
+                await pending_write
+        finally:
+            await asyncio.get_running_loop().run_in_executor(self._writer, self.close)
+
+    def close(self):
+        if self._io is None:
+            return
+        if self._render_task:
+            self._render_task.cancel()
+            self._render_task = None
+        super().close()
+        self._write(self._io.popvalue())
+        self._io.close()
+        self._io = None
+        self._writer.shutdown(wait=False)
+
+    async def _render_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if self._pending_write is None or self._pending_write.done():
+                self._render_frame(time.monotonic_ns())
+                if frame := self._io.popvalue():
+                    self._pending_write = loop.run_in_executor(self._writer, self._write, frame)
+            else:
+                self._governor.dropped_frames += 1
+            await asyncio.sleep(self._governor.interval_ns / 1e9)
+
+    def _write(self, frame: str):
+        if not frame:
+            return
+        try:
+            self._target_io.write(frame)
+            self._target_io.flush()
+        except Exception as e:  # pragma: no cover
+            logger.exception(e)
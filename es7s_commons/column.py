@@ -5,6 +5,7 @@ from math import floor, ceil
 import pytermor as pt
 
 from .strutil import UCS_CONTROL_CHARS
+from .termstate import get_terminal_width
 
 
 _dcu = lambda s: pt.apply_filters(
@@ -90,7 +91,7 @@ def columns(
     # it preemptively -- with adding its width to max possible width instead of subtracting it from whenever
     # (as we do not have a value to subtract that from yet at the first place):
     max_col_w = ts.max_line_len + len(gap)
-    total_w = pt.get_terminal_width(pad=0) + len(gap)
+    total_w = get_terminal_width(pad=0) + len(gap)
     ts.col_count = floor(total_w/max_col_w)
     if ts.col_count < 2:
         return __postprocess(lines), ts
@@ -0,0 +1,230 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
+from __future__ import annotations
+
+import threading
+import time
+import typing as t
+
+import pytermor as pt
+
+from .progressbar import ProgressBar, _RenderTicker
+
+
+class ProgressBarTask:
+    """
+    One line of `MultiProgressBar`. Counters and labels are plain attribute
+    writes, so the task can be updated from a worker thread; the line is
+    removed from the stack when the task is closed.
+    """
+
+    def __init__(self, mbar: MultiProgressBar, task_num: int, task_label: str, steps_amount: int):
+        self._mbar = mbar
+        self._task_num = task_num
+        self._task_label = task_label
+        self._steps_amount = steps_amount
+        self._step_num = 0
+        self._step_label = ""
+        self._closed = False
+
+    def __enter__(self) -> ProgressBarTask:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def init_steps(self, steps_amount: int = None, step_num: int = 0):
+        if steps_amount is not None:
+            self._steps_amount = steps_amount
+        if step_num is not None:
+            self._step_num = step_num
+        self._step_num = min(self._step_num, self._steps_amount)
+
+    def next_step(self, step_label: str = None):
+        if step_label is not None:
+            self._step_label = step_label
+        self.init_steps(step_num=self._step_num + 1)
+
+    def set_label(self, task_label: str = None, step_label: str = None):
+        if task_label is not None:
+            self._task_label = task_label
+        if step_label is not None:
+            self._step_label = step_label
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._mbar._on_task_closed(self)
+
+    def _compute_progress(self) -> float:
+        if not self._steps_amount:
+            return 0.0
+        return max(0, self._step_num - 1) / self._steps_amount
+
+
+class MultiProgressBar(ProgressBar):
+    """
+    Stack of progress bars, one line per active task plus the summary line
+    at the bottom. Every frame is written to the output in one go, and only
+    the lines which differ from the previous frame are redrawn. The summary
+    line is persisted exactly as the one of the regular `ProgressBar`.
+
+    >>> mbar = MultiProgressBar(renderer, sys.stderr, pt.cv.BLUE, len(urls), background=True)
+    >>> with mbar, ThreadPoolExecutor() as executor:
+    >>>     executor.map(download, urls)
+    >>>
+    >>> def download(url):  # in the workers
+    >>>     with mbar.add_task(url, steps_amount=chunks) as task:
+    >>>         task.next_step()
+
+    The tasks do not render anything by themselves, so the frames are drawn
+    either by the ``background`` thread, or by `render()` calls made by the
+    owner thread. If the formatting is not allowed (e.g. the output is not a terminal), only
+    the summary line is rendered.
+    """
+
+    CSI_ED0 = pt.make_clear_display_after_cursor().assemble()
+
+    def __init__(
+        self,
+        renderer: pt.IRenderer,
+        io: t.IO,
+        theme_color: pt.Color,
+        tasks_amount=1,
+        task_label="Total",
+        step_label="",
+        print_step_num=True,
+        background=False,
+    ):
+        super().__init__(
+            renderer,
+            io,
+            theme_color,
+            tasks_amount=tasks_amount,
+            task_num=0,
+            task_label=task_label,
+            step_label=step_label,
+            print_step_num=print_step_num,
+        )
+        self._tasks: list[ProgressBarTask] = []
+        self._tasks_lock = threading.Lock()
+        self._tasks_started = 0
+
+        self._drawn_lines: list[str] = []
+        """ Lines of the last frame, top to bottom; cursor is on the last one. """
+
+        if background:
+            self._ticker = _RenderTicker(self)
+            self._ticker.start()
+
+    def add_task(self, task_label: str, steps_amount: int = 0) -> ProgressBarTask:
+        with self._tasks_lock:
+            self._tasks_started += 1
+            self._tasks_amount = max(self._tasks_amount, self._tasks_started)
+            task = ProgressBarTask(self, self._tasks_started, task_label, steps_amount)
+            self._tasks.append(task)
+        return task
+
+    def close(self):
+        if self._ticker:
+            self._ticker.stop()
+            self._ticker = None
+
+        if self.is_format_allowed and self._drawn_lines:
+            self._io.write(self._get_cursor_to_top() + self.CSI_ED0)
+            self._io.flush()
+            self._drawn_lines.clear()
+        super().close()
+
+    def _on_task_closed(self, task: ProgressBarTask):
+        with self._tasks_lock:
+            self._tasks.remove(task)
+            self._task_num += 1
+
+    def _render_frame(self, started_ts: int):
+        self._compute_max_label_len()
+        self._icon_frame += 1
+
+        with self._tasks_lock:
+            tasks = [*self._tasks]
+        template = self._get_template()
+        ratio = self._compute_total_progress(tasks)
+        summary_args = (ratio, self._task_label, "", self._step_label)
+
+        if not self.is_format_allowed:
+            if self._should_persist():
+                delta_str = pt.format_time_ns(time.monotonic_ns() - self._created_at)
+                self._echo(template.render_raw(f"+{delta_str}", *summary_args), persist=True)
+            self._echo(template.render(self._icon_frame, self._task_num, *summary_args))
+            self._governor.on_frame_rendered(started_ts, time.monotonic_ns())
+            return
+
+        lines = [
+            template.render(
+                0,
+                task._task_num,
+                task._compute_progress(),
+                task._task_label,
+                self._format_task_step_num(task),
+                task._step_label,
+            )
+            for task in tasks
+        ]
+        lines.append(template.render(self._icon_frame, self._task_num, *summary_args))
+
+        output = []
+        if self._should_persist():
+            delta_str = pt.format_time_ns(time.monotonic_ns() - self._created_at)
+            output += [
+                self._get_cursor_to_top(),
+                self.CSI_ED0,
+                template.render_raw(f"+{delta_str}", *summary_args),
+                "\n",
+            ]
+            self._drawn_lines.clear()
+            self._update_last_persist_ts()
+        output += self._diff_lines(lines)
+
+        self._io.write("".join(output))
+        self._io.flush()
+        self._governor.on_frame_rendered(started_ts, time.monotonic_ns())
+
+    def _diff_lines(self, lines: list[str]) -> list[str]:
+        """
+        Compose the output transforming the last drawn frame into ``lines``,
+        starting from the cursor being on the last line of the former.
+        """
+        output = [self._get_cursor_to_top()]
+        drawn = self._drawn_lines
+
+        for idx, line in enumerate(lines):
+            if idx > 0:
+                output.append("\n")
+            if idx < len(drawn) and drawn[idx] == line:
+                continue
+            output += [self.OUT_START, line, self.CSI_EL0, self.SGR_RESET]
+
+        if len(drawn) > len(lines):
+            # the stack became shorter, remove the leftovers below the new bottom line
+            output += ["\n", self.CSI_ED0, pt.make_move_cursor_up(1).assemble()]
+
+        self._drawn_lines = lines
+        return output
+
+    def _get_cursor_to_top(self) -> str:
+        if len(self._drawn_lines) < 2:
+            return self.CSI_CHA1
+        return pt.make_move_cursor_up_to_start(len(self._drawn_lines) - 1).assemble()
+
+    def _compute_total_progress(self, tasks: list[ProgressBarTask]) -> float:
+        if not self._tasks_amount:
+            return 0.0
+        active = sum(task._compute_progress() for task in tasks)
+        return min(1.0, (self._task_num + active) / self._tasks_amount)
+
+    def _format_task_step_num(self, task: ProgressBarTask) -> str:
+        if not self._print_step_num:
+            return ""
+        return f"[{task._step_num}/{task._steps_amount}] "
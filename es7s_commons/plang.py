@@ -2,8 +2,18 @@
 #  es7s/commons
 #  (c) 2023 A. Shavykin <0.delameter@gmail.com>
 # ------------------------------------------------------------------------------
+from __future__ import annotations
+
+import math
+import os
+import re
+import typing as t
+from collections import Counter, defaultdict
+
 import pytermor as pt
 
+from .scale import FULL_BLOCK, Scale
+
 
 class PLangColor(pt.RealColor, pt.RenderColor, pt.ResolvableColor["PLangColor"]):
     # fmt: off
@@ -595,25 +605,597 @@ class PLangColor(pt.RealColor, pt.RenderColor, pt.ResolvableColor["PLangColor"])
         "#": "sharp",
         "+": "plus",
     }
+
+    ALIAS_MAP = {
+        "asm":          "Assembly",
+        "bash":         "Shell",
+        "cpp":          "C++",
+        "cs":           "C#",
+        "coffee":       "CoffeeScript",
+        "cxx":          "C++",
+        "elisp":        "Emacs Lisp",
+        "erl":          "Erlang",
+        "ex":           "Elixir",
+        "golang":       "Go",
+        "hs":           "Haskell",
+        "js":           "JavaScript",
+        "kt":           "Kotlin",
+        "md":           "Markdown",
+        "ml":           "OCaml",
+        "node":         "JavaScript",
+        "objc":         "Objective-C",
+        "objcpp":       "Objective-C++",
+        "perl6":        "Raku",
+        "pl":           "Perl",
+        "posh":         "PowerShell",
+        "ps1":          "PowerShell",
+        "py":           "Python",
+        "python3":      "Python",
+        "rb":           "Ruby",
+        "rs":           "Rust",
+        "sh":           "Shell",
+        "ts":           "TypeScript",
+        "vim":          "Vim Script",
+        "viml":         "Vim Script",
+        "yml":          "YAML",
+        "zsh":          "Shell",
+    }
     # fmt: on
 
+    _NAME_STRIP_REGEX = re.compile(R"[\W_]+")
+
     # curl https://raw.githubusercontent.com/github/linguist/master/lib/linguist/languages.yml | sed -Ee '/^(\w|\s+color)/!d; s/^(.+):$/\n"\1":/g; s/color:\s*"#(.+)"/0x\1,\n/' | sed -zEe 's/"[^"]+":\n\n/\n/g; s/:\n\s+/:\t/g' | sed -Ee '/^\s*$/d'  | column -ts$'\x09' | xsel --clipboard
 
+    LAZY_REGISTRY = True
+    """
+    Construct and register the instances on demand: a name lookup creates
+    only the requested color, while the first approximation request (or
+    any other operation involving all the colors) loads the whole ``MAP``.
+    """
+
+    _instances: dict[str, PLangColor] = {}
+    _loaded = False
+    _name_index: dict[str, str] | None = None
+
     def __init__(self, value: pt.IColorValue | int, name: str = None):
         pt.RealColor.__init__(self, value)
         pt.ResolvableColor.__init__(self, name, approx=True, register=True)
+        self._sgr_cache: dict[tuple[pt.ColorTarget, type | None], pt.SequenceSGR] = dict()
+        self._sgr_str_cache: dict[tuple[pt.ColorTarget, type | None], str] = dict()
+        self._tmux_cache: dict[pt.ColorTarget, str] = dict()
+
+    @classmethod
+    def find(cls, name: str) -> PLangColor | None:
+        """
+        Resolve language name in any of the commonly encountered forms: as is
+        ("C++"), case-folded ("c++"), normalized ("cplusplus", "objectivec")
+        or as an alias from `ALIAS_MAP` ("cpp"). Unlike `find_by_name()`,
+        returns *None* instead of raising an error if nothing was found.
+        """
+        if not cls.LAZY_REGISTRY:
+            cls._ensure_loaded()
+        index = cls._get_name_index()
+        if (key := index.get(name)) is None:
+            if (key := index.get(cls.normalize_name(name))) is None:
+                return None
+        return cls._make(key)
+
+    @classmethod
+    def find_by_name(cls, name: str) -> PLangColor:
+        if color := cls.find(name):
+            return color
+        return super().find_by_name(name)
+
+    @classmethod
+    def normalize_name(cls, name: str) -> str:
+        name = name.casefold()
+        for char, replacement in cls.NAME_NORMALIZATION_MAP.items():
+            name = name.replace(char, replacement)
+        return cls._NAME_STRIP_REGEX.sub("", name)
 
     @classmethod
     def get_longest_name(cls) -> int:
         return max(map(len, cls.MAP.keys()))
 
-    to_sgr = pt.ColorRGB.to_sgr
-    to_tmux = pt.ColorRGB.to_tmux
+    def to_sgr(
+        self, target: pt.ColorTarget = pt.ColorTarget.FG, upper_bound: t.Type[pt.Color] = None
+    ) -> pt.SequenceSGR:
+        """
+        Same as `ColorRGB.to_sgr()`, but the result is computed once per target
+        and upper bound (i.e., renderer output mode), which includes the
+        approximation to xterm-256 or xterm-16 palettes when downgrading.
+        """
+        key = (target, upper_bound)
+        if (sgr := self._sgr_cache.get(key)) is None:
+            sgr = self._sgr_cache[key] = pt.ColorRGB.to_sgr(self, target, upper_bound)
+        return sgr
+
+    def to_sgr_str(
+        self, target: pt.ColorTarget = pt.ColorTarget.FG, upper_bound: t.Type[pt.Color] = None
+    ) -> str:
+        """Assembled and cached `to_sgr()` result."""
+        key = (target, upper_bound)
+        if (sgr_str := self._sgr_str_cache.get(key)) is None:
+            sgr_str = self._sgr_str_cache[key] = self.to_sgr(target, upper_bound).assemble()
+        return sgr_str
+
+    def to_tmux(self, target: pt.ColorTarget = pt.ColorTarget.FG) -> str:
+        if (tmux := self._tmux_cache.get(target)) is None:
+            tmux = self._tmux_cache[target] = pt.ColorRGB.to_tmux(self, target)
+        return tmux
 
     def repr_attrs(self, verbose: bool = True) -> str:
         return f'{self.format_value("#")}({self.name})'
 
+    @classmethod
+    def _ensure_loaded(cls):
+        if not cls._loaded:
+            cls._load()
+
     @classmethod
     def _load(cls):
-        for name, value in cls.MAP.items():
-            PLangColor(value, name)
+        for name in cls.MAP.keys():
+            cls._make(name)
+        cls._loaded = True
+
+    @classmethod
+    def _get_name_index(cls) -> dict[str, str]:
+        if cls._name_index is None:
+            index = dict()
+            for name in cls.MAP.keys():
+                index.setdefault(name, name)
+                index.setdefault(name.casefold(), name)
+                index.setdefault(cls.normalize_name(name), name)
+            for alias, name in cls.ALIAS_MAP.items():
+                index.setdefault(cls.normalize_name(alias), name)
+            cls._name_index = index
+        return cls._name_index
+
+    @classmethod
+    def _make(cls, name: str) -> PLangColor:
+        if (color := cls._instances.get(name)) is None:
+            color = cls._instances[name] = PLangColor(cls.MAP[name], name)
+        return color
+
+
+class PLangClassifier:
+    """
+    Maps file paths to `PLangColor` instances by well-known file names
+    (``Makefile``, ``Dockerfile``) and extensions (``.py``, ``.d.ts``).
+    Lookup results are memoized per suffix, so classifying a large
+    number of paths boils down to a couple of dict hits per path.
+    """
+
+    # fmt: off
+    FILENAME_MAP = {
+        ".bash_profile":      "Shell",
+        ".bashrc":            "Shell",
+        ".editorconfig":      "EditorConfig",
+        ".gitattributes":     "Git Attributes",
+        ".gitconfig":         "Git Config",
+        ".gitignore":         "Ignore List",
+        ".profile":           "Shell",
+        ".vimrc":             "Vim Script",
+        ".zshrc":             "Shell",
+        "BUILD":              "Starlark",
+        "BUILD.bazel":        "Starlark",
+        "CMakeLists.txt":     "CMake",
+        "Containerfile":      "Dockerfile",
+        "Dockerfile":         "Dockerfile",
+        "GNUmakefile":        "Makefile",
+        "Gemfile":            "Ruby",
+        "Jenkinsfile":        "Groovy",
+        "Justfile":           "Just",
+        "Makefile":           "Makefile",
+        "Procfile":           "Procfile",
+        "Rakefile":           "Ruby",
+        "Vagrantfile":        "Ruby",
+        "WORKSPACE":          "Starlark",
+        "go.mod":             "Go Module",
+        "justfile":           "Just",
+        "makefile":           "Makefile",
+        "meson.build":        "Meson",
+    }
+
+    EXTENSION_MAP = {
+        ".adb":               "Ada",
+        ".ads":               "Ada",
+        ".asm":               "Assembly",
+        ".astro":             "Astro",
+        ".awk":               "Awk",
+        ".bash":              "Shell",
+        ".bat":               "Batchfile",
+        ".bib":               "BibTeX",
+        ".blade.php":         "Blade",
+        ".c":                 "C",
+        ".cc":                "C++",
+        ".cjs":               "JavaScript",
+        ".cl":                "Common Lisp",
+        ".clj":               "Clojure",
+        ".cljs":              "Clojure",
+        ".cmake":             "CMake",
+        ".cmd":               "Batchfile",
+        ".coffee":            "CoffeeScript",
+        ".cpp":               "C++",
+        ".cr":                "Crystal",
+        ".cs":                "C#",
+        ".css":               "CSS",
+        ".cu":                "Cuda",
+        ".cxx":               "C++",
+        ".d":                 "D",
+        ".d.ts":              "TypeScript",
+        ".dart":              "Dart",
+        ".diff":              "diff",
+        ".dockerfile":        "Dockerfile",
+        ".el":                "Emacs Lisp",
+        ".elm":               "Elm",
+        ".erl":               "Erlang",
+        ".ex":                "Elixir",
+        ".exs":               "Elixir",
+        ".f90":               "Fortran",
+        ".fish":              "fish",
+        ".frag":              "GLSL",
+        ".fs":                "F#",
+        ".fsx":               "F#",
+        ".gd":                "GDScript",
+        ".gemspec":           "Ruby",
+        ".glsl":              "GLSL",
+        ".go":                "Go",
+        ".gradle":            "Gradle",
+        ".graphql":           "GraphQL",
+        ".groovy":            "Groovy",
+        ".h":                 "C",
+        ".hack":              "Hack",
+        ".haml":              "Haml",
+        ".hbs":               "Handlebars",
+        ".hcl":               "HCL",
+        ".hh":                "C++",
+        ".hlsl":              "HLSL",
+        ".hpp":               "C++",
+        ".hrl":               "Erlang",
+        ".hs":                "Haskell",
+        ".htm":               "HTML",
+        ".html":              "HTML",
+        ".hx":                "Haxe",
+        ".hxx":               "C++",
+        ".ini":               "INI",
+        ".ipynb":             "Jupyter Notebook",
+        ".j2":                "Jinja",
+        ".java":              "Java",
+        ".jinja":             "Jinja",
+        ".jl":                "Julia",
+        ".js":                "JavaScript",
+        ".json":              "JSON",
+        ".jsonnet":           "Jsonnet",
+        ".jsx":               "JavaScript",
+        ".kt":                "Kotlin",
+        ".kts":               "Kotlin",
+        ".less":              "Less",
+        ".lisp":              "Common Lisp",
+        ".ll":                "LLVM",
+        ".lua":               "Lua",
+        ".m":                 "Objective-C",
+        ".mak":               "Makefile",
+        ".md":                "Markdown",
+        ".mdx":               "MDX",
+        ".mjs":               "JavaScript",
+        ".mk":                "Makefile",
+        ".ml":                "OCaml",
+        ".mli":               "OCaml",
+        ".mm":                "Objective-C++",
+        ".nim":               "Nim",
+        ".nix":               "Nix",
+        ".nu":                "Nushell",
+        ".org":               "Org",
+        ".pas":               "Pascal",
+        ".patch":             "diff",
+        ".php":               "PHP",
+        ".pl":                "Perl",
+        ".pm":                "Perl",
+        ".pp":                "Puppet",
+        ".ps1":               "PowerShell",
+        ".psm1":              "PowerShell",
+        ".pug":               "Pug",
+        ".purs":              "PureScript",
+        ".py":                "Python",
+        ".pyi":               "Python",
+        ".pyx":               "Cython",
+        ".qml":               "QML",
+        ".r":                 "R",
+        ".raku":              "Raku",
+        ".rake":              "Ruby",
+        ".rb":                "Ruby",
+        ".res":               "ReScript",
+        ".rkt":               "Racket",
+        ".rs":                "Rust",
+        ".rst":               "reStructuredText",
+        ".sass":              "Sass",
+        ".scala":             "Scala",
+        ".scm":               "Scheme",
+        ".scss":              "SCSS",
+        ".sh":                "Shell",
+        ".sml":               "Standard ML",
+        ".sol":               "Solidity",
+        ".sql":               "SQL",
+        ".styl":              "Stylus",
+        ".sv":                "SystemVerilog",
+        ".svelte":            "Svelte",
+        ".swift":             "Swift",
+        ".tcl":               "Tcl",
+        ".tex":               "TeX",
+        ".tf":                "HCL",
+        ".toml":              "TOML",
+        ".ts":                "TypeScript",
+        ".tsx":               "TSX",
+        ".twig":              "Twig",
+        ".txt":               "text",
+        ".v":                 "V",
+        ".vala":              "Vala",
+        ".vb":                "Visual Basic .NET",
+        ".vert":              "GLSL",
+        ".vhd":               "VHDL",
+        ".vim":               "Vim Script",
+        ".vue":               "Vue",
+        ".wgsl":              "WGSL",
+        ".xml":               "XML",
+        ".xsl":               "XSLT",
+        ".yaml":              "YAML",
+        ".yml":               "YAML",
+        ".zig":               "Zig",
+        ".zsh":               "Shell",
+    }
+    # fmt: on
+
+    def __init__(self):
+        self._cache: dict[str, PLangColor | None] = dict()
+
+    def classify(self, path: str | os.PathLike) -> PLangColor | None:
+        if (key := self._get_key(path)) not in self._cache:
+            self._cache[key] = self._resolve(key)
+        return self._cache[key]
+
+    def classify_many(self, paths: t.Iterable[str | os.PathLike]) -> list[PLangColor | None]:
+        """
+        Batch variant of `classify()`. Paths are grouped by suffix, and each
+        suffix (or well-known file name) is resolved only once.
+
+        :return: Colors in the same order as the input paths; *None* for
+                 unrecognized ones.
+        """
+        keys = [*map(self._get_key, paths)]
+        for key in {*keys} - self._cache.keys():
+            self._cache[key] = self._resolve(key)
+        return [*map(self._cache.__getitem__, keys)]
+
+    def _get_key(self, path: str | os.PathLike) -> str:
+        filename = os.path.basename(path)
+        if filename in self.FILENAME_MAP:
+            return filename
+        if (last_dot := filename.rfind(".")) <= 0:
+            return filename
+        if (prev_dot := filename.rfind(".", 0, last_dot)) > 0:
+            if (suffix := filename[prev_dot:].lower()) in self.EXTENSION_MAP:
+                return suffix
+        return filename[last_dot:].lower()
+
+    def _resolve(self, key: str) -> PLangColor | None:
+        if name := (self.FILENAME_MAP.get(key) or self.EXTENSION_MAP.get(key)):
+            return PLangColor.find(name)
+        return None
+
+
+class PLangBreakdown:
+    """
+    Linguist-style language statistics accumulated over a stream of
+    ``(path, size)`` records, without materializing the file list.
+
+    Partial breakdowns (e.g. per directory, computed in a process pool) can be
+    combined with `merge()` or ``+``; the instances are picklable and carry
+    only the counters.
+    """
+
+    OTHER_LABEL = "Other"
+    OTHER_COLOR = pt.cv.GRAY_50
+    FEED_CHUNK_SIZE = 1024
+
+    def __init__(self, classifier: PLangClassifier = None):
+        self._classifier = classifier or PLangClassifier()
+        self._sizes: Counter[str | None] = Counter()
+        self._file_counts: Counter[str | None] = Counter()
+
+    def add(self, path: str | os.PathLike, size: int):
+        self._count(self._classifier.classify(path), size)
+
+    def feed(self, records: t.Iterable[tuple[str | os.PathLike, int]]) -> PLangBreakdown:
+        chunk: list[tuple[str | os.PathLike, int]] = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= self.FEED_CHUNK_SIZE:
+                self._feed_chunk(chunk)
+                chunk.clear()
+        self._feed_chunk(chunk)
+        return self
+
+    def merge(self, *others: PLangBreakdown) -> PLangBreakdown:
+        for other in others:
+            self._sizes.update(other._sizes)
+            self._file_counts.update(other._file_counts)
+        return self
+
+    def __iadd__(self, other: PLangBreakdown) -> PLangBreakdown:
+        return self.merge(other)
+
+    def __add__(self, other: PLangBreakdown) -> PLangBreakdown:
+        return PLangBreakdown(self._classifier).merge(self, other)
+
+    def __getstate__(self) -> dict:
+        return dict(sizes=self._sizes, file_counts=self._file_counts)
+
+    def __setstate__(self, state: dict):
+        self._classifier = PLangClassifier()
+        self._sizes = state["sizes"]
+        self._file_counts = state["file_counts"]
+
+    @property
+    def total_size(self) -> int:
+        return sum(self._sizes.values())
+
+    @property
+    def file_count(self) -> int:
+        return sum(self._file_counts.values())
+
+    def get_shares(self) -> list[tuple[str | None, int, float]]:
+        """
+        :return: (language name, bytes, ratio) tuples, largest first; name is
+                 *None* for the files that were not recognized.
+        """
+        if not (total := self.total_size):
+            return []
+        return [(name, size, size / total) for name, size in self._sizes.most_common() if size]
+
+    def make_bar(self, width: int) -> pt.Text:
+        """
+        Proportional bar of ``width`` cells colored by language. The cells are
+        distributed with the largest remainder method, so the languages with
+        tiny shares can get no cells at all.
+        """
+        shares = self.get_shares()
+        cells = [math.floor(ratio * width) for _, _, ratio in shares]
+        remainders = sorted(range(len(shares)), key=lambda idx: cells[idx] - shares[idx][2] * width)
+        for idx in remainders[: width - sum(cells)]:
+            cells[idx] += 1
+
+        result = pt.Text()
+        for (name, _, _), cell_num in zip(shares, cells):
+            if cell_num:
+                result += pt.Fragment(FULL_BLOCK * cell_num, pt.Style(fg=self._get_color(name)))
+        return result
+
+    def make_legend(
+        self,
+        scale_len: int = Scale.SCALE_LEN,
+        limit: int = None,
+    ) -> t.Iterable[pt.Text]:
+        for name, size, ratio in self.get_shares()[:limit]:
+            scale = Scale(ratio, pt.NOOP_STYLE, pt.Style(fg=self._get_color(name)), scale_len)
+            label = name or self.OTHER_LABEL
+            yield scale + pt.Fragment(f" {pt.format_bytes_human(size):>5s}  {label}")
+
+    def _feed_chunk(self, chunk: list[tuple[str | os.PathLike, int]]):
+        colors = self._classifier.classify_many(path for path, _ in chunk)
+        for color, (_, size) in zip(colors, chunk):
+            self._count(color, size)
+
+    def _count(self, color: PLangColor | None, size: int):
+        name = color.name if color else None
+        self._sizes[name] += size
+        self._file_counts[name] += 1
+
+    def _get_color(self, name: str | None) -> pt.Color:
+        if name is None:
+            return self.OTHER_COLOR
+        return PLangColor._make(name)
+
+
+class PLangColorGrid:
+    """
+    Nearest-neighbour index over `PLangColor.MAP` values: a coarse 3D bucket
+    grid in RGB space, searched in expanding shells of cells around the target
+    cell until no unvisited cell can contain anything closer. Distance is
+    Euclidean in RGB (unlike pytermor approximators, which work in LAB).
+
+    Batch queries are vectorized with NumPy if it's available and fall back
+    to memoized grid lookups otherwise.
+    """
+
+    CELL_SIZE = 32
+    BATCH_CHUNK_SIZE = 4096
+
+    def __init__(self):
+        self._cells: dict[tuple[int, int, int], list[tuple[int, int, int, str]]] = defaultdict(list)
+        for name, value in PLangColor.MAP.items():
+            r, g, b = _to_channels(value)
+            self._cells[self._get_cell(r, g, b)].append((r, g, b, name))
+        self._max_radius = 255 // self.CELL_SIZE
+        self._cache: dict[int, PLangColor] = dict()
+
+    def find_closest(self, value: pt.IColorValue | int) -> PLangColor:
+        value = _to_int(value)
+        if (closest := self._cache.get(value)) is None:
+            closest = self._cache[value] = self.approximate(value).pop(0).color
+        return closest
+
+    def find_closest_many(self, values: t.Iterable[pt.IColorValue | int]) -> list[PLangColor]:
+        values = [*map(_to_int, values)]
+        try:
+            import numpy
+        except ImportError:
+            return [*map(self.find_closest, values)]
+        return self._find_closest_many_np(numpy, values)
+
+    def approximate(
+        self,
+        value: pt.IColorValue | int,
+        max_results=1,
+    ) -> list[pt.ApxResult[PLangColor]]:
+        """
+        Search for the language colors nearest to ``value`` and return the
+        first ``max_results`` of them, closest first.
+        """
+        r, g, b = _to_channels(_to_int(value))
+        cr, cg, cb = self._get_cell(r, g, b)
+        found: list[tuple[int, str]] = []
+
+        for radius in range(self._max_radius + 1):
+            for cell in self._iter_shell(cr, cg, cb, radius):
+                for pr, pg, pb, name in self._cells.get(cell, ()):
+                    found.append(((pr - r) ** 2 + (pg - g) ** 2 + (pb - b) ** 2, name))
+            # any color outside the shells visited so far is farther than R*CELL_SIZE:
+            if len(found) >= max_results:
+                found.sort()
+                if found[max_results - 1][0] <= (radius * self.CELL_SIZE) ** 2:
+                    break
+
+        found.sort()
+        return [
+            pt.ApxResult(PLangColor._make(name), math.sqrt(dist_sq))
+            for dist_sq, name in found[:max_results]
+        ]
+
+    def _find_closest_many_np(self, np, values: list[int]) -> list[PLangColor]:
+        names = [*PLangColor.MAP.keys()]
+        palette = np.array([*map(_to_channels, PLangColor.MAP.values())], dtype=np.int64)
+        palette_sq = (palette**2).sum(axis=1)
+        result = []
+        for start in range(0, len(values), self.BATCH_CHUNK_SIZE):
+            chunk = np.array(values[start : start + self.BATCH_CHUNK_SIZE], dtype=np.int64)
+            targets = np.stack([(chunk >> 16) & 0xFF, (chunk >> 8) & 0xFF, chunk & 0xFF], axis=1)
+            # |t-p|² = |t|² - 2t·p + |p|², and |t|² is the same for the whole row:
+            dist_sq = palette_sq[None, :] - 2 * targets @ palette.T
+            result.extend(PLangColor._make(names[idx]) for idx in dist_sq.argmin(axis=1))
+        return result
+
+    def _get_cell(self, r: int, g: int, b: int) -> tuple[int, int, int]:
+        return r // self.CELL_SIZE, g // self.CELL_SIZE, b // self.CELL_SIZE
+
+    @staticmethod
+    def _iter_shell(cr: int, cg: int, cb: int, radius: int) -> t.Iterable[tuple[int, int, int]]:
+        # cells with Chebyshev distance to the center equal to the radius:
+        for dr in range(-radius, radius + 1):
+            for dg in range(-radius, radius + 1):
+                if radius in (abs(dr), abs(dg)):
+                    dbs = range(-radius, radius + 1)
+                else:
+                    dbs = (-radius, radius)
+                for db in dbs:
+                    yield cr + dr, cg + dg, cb + db
+
+
+def _to_int(value: pt.IColorValue | int) -> int:
+    if isinstance(value, pt.IColorValue):
+        return value.int
+    return value
+
+
+def _to_channels(value: int) -> tuple[int, int, int]:
+    return (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF
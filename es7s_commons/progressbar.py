@@ -2,21 +2,35 @@
 #  es7s/commons
 #  (c) 2023 A. Shavykin <0.delameter@gmail.com>
 # ------------------------------------------------------------------------------
+from __future__ import annotations
+
+import json
 import math
+import re
 import sys
+import threading
 import time
-import typing
 import typing as t
+from collections.abc import Sized
 from io import StringIO
 
 import pytermor as pt
+
+from .common import logger
+from .rate import format_eta, format_rate, RateEstimator
 from .scale import FULL_BLOCK, get_partial_hblock
+from .termstate import get_terminal_width
+
+_T = t.TypeVar("_T")
 
 
 class DummyProgressBar:
+    MIN_RENDER_INTERVAL_SEC = 1
+
     def __init__(self, *_, **__):
         self._label = ""
         self._count = 0
+        self._last_render_ts: int | None = None
 
     def init_tasks(self, tasks_amount: int = None, task_num: int = 1):
         ...
@@ -32,7 +46,17 @@ class DummyProgressBar:
         self._label = step_label
         self._count += 1
 
+    def track(self, iterable: t.Iterable[_T], *_, **__) -> t.Iterator[_T]:
+        for item in iterable:
+            self._count += 1
+            yield item
+
     def render(self):
+        now = time.monotonic_ns()
+        if self._last_render_ts is not None:
+            if now - self._last_render_ts < self.MIN_RENDER_INTERVAL_SEC * 1e9:
+                return
+        self._last_render_ts = now
         sys.stderr.write(f"{pt.get_qname(self)} [{self._count}] {self._label}\n")
 
     def close(self, *args, **kwargs):
@@ -44,9 +68,13 @@ class ProgressBar:
     LABEL_PAD = 2
 
     MAX_FRAME_RATE = 16
-    FRAME_INTERVAL_SEC = 1 / MAX_FRAME_RATE
-    TERM_WIDTH_QUERY_INTERVAL_SEC = 5
+    MIN_FRAME_RATE = 1
+    PIPE_MAX_FRAME_RATE = 1
+    MAX_RENDER_LOAD = 0.05
+    """ Max share of wall time allowed to be spent on rendering and writing the frames. """
     PERSIST_MIN_INTERVAL_SEC = 5
+    TRACK_CHECKS_PER_FRAME = 4
+    TRACK_MAX_BATCH = 1 << 16
 
     SGR_RESET = pt.SeqIndex.RESET.assemble()
     CSI_CHA1 = pt.make_set_cursor_column(1).assemble()
@@ -72,13 +100,30 @@ class ProgressBar:
         step_num=0,
         step_label="...",
         print_step_num=True,
+        background=False,
+        print_rate=False,
+        cell_diff=False,
     ):
+        """
+        :param background:  Render the frames in a separate thread at a fixed
+                            frame rate; `next_task()` and `next_step()` only
+                            update the counters and labels. Requires `close()`
+                            to be called to stop the thread (or usage of the
+                            instance as a context manager).
+        :param print_rate:  Display the step rate and the estimated time left
+                            after the step counter, in the persisted lines as well.
+        :param cell_diff:   Redraw only the changed parts of the line, as long as
+                            the output is formatted; nothing else should write
+                            to the same terminal line in the meantime.
+        """
         self._last_persist_ts: int | None = None
         self._created_at = time.monotonic_ns()
 
         self._renderer = renderer
         self._io = io
         self._output_buffer = _OutputBuffer()
+        self._cell_differ = _CellDiffer() if cell_diff else None
+        self._bytes_written = 0
         self._styles = _PBarStyles(theme_color)
 
         self._tasks_amount: int = tasks_amount
@@ -90,17 +135,81 @@ class ProgressBar:
         self._step_label: str = step_label
 
         self._print_step_num = print_step_num
-
-        self._next_frame_ts: int | None = None
+        self._print_rate = print_rate
+        self._steps_done = 0  # over all tasks, for the rate
+        self._step_rate = RateEstimator()
+        self._progress_rate = RateEstimator()
+
+        self._governor = _FrameGovernor(
+            self.PIPE_MAX_FRAME_RATE if not self._is_tty() else self.MAX_FRAME_RATE,
+            self.MIN_FRAME_RATE,
+            self.MAX_RENDER_LOAD,
+        )
         self._icon_frame = 0
+        self._template: _FrameTemplate | None = None
+        self._template_key: tuple | None = None
 
         self._max_label_len: int | None = None
-        self._last_term_width_query_ts: int | None = None
+
+        self._ticker: _RenderTicker | None = None
+        if background:
+            self._ticker = _RenderTicker(self)
+            self._ticker.start()
+
+    def __enter__(self) -> ProgressBar:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
     @property
     def is_format_allowed(self) -> bool:
         return self._renderer.is_format_allowed
 
+    @property
+    def effective_fps(self) -> float:
+        """Current frame rate limit, adjusted to the measured frame cost."""
+        return self._governor.effective_fps
+
+    @property
+    def frame_interval_sec(self) -> float:
+        """Current interval between the frames, see `effective_fps`."""
+        return self._governor.interval_ns / 1e9
+
+    @property
+    def dropped_frames(self) -> int:
+        """Amount of `render()` calls skipped because the frame was not due yet."""
+        return self._governor.dropped_frames
+
+    @property
+    def bytes_written(self) -> int:
+        """Total amount of bytes written to the output (UTF-8)."""
+        return self._bytes_written
+
+    @property
+    def bytes_per_frame(self) -> float:
+        """Average amount of bytes written per rendered frame."""
+        return self._bytes_written / max(1, self._governor.rendered_frames)
+
+    @property
+    def steps_done(self) -> int:
+        """Amount of steps done over all the tasks, which the rate is computed from."""
+        return self._steps_done
+
+    @steps_done.setter
+    def steps_done(self, value: int):
+        self._steps_done = value
+
+    @property
+    def rate(self) -> float | None:
+        """Steps per second, updated each frame."""
+        return self._step_rate.get_rate()
+
+    @property
+    def eta(self) -> float | None:
+        """Estimated seconds left until all the tasks are done, updated each frame."""
+        return self._progress_rate.get_eta(self._tasks_amount)
+
     def init_tasks(self, tasks_amount: int = None, task_num: int = 1):
         if tasks_amount is not None:
             self._tasks_amount = tasks_amount
@@ -128,72 +237,168 @@ class ProgressBar:
         if step_label is not None:
             self._step_label = step_label
         self.init_steps(step_num=self._step_num + 1)
+        self._steps_done += 1
         if render:
             self.render()
 
-    def render(self):
-        self._compute_max_label_len()
+    def set_labels(self, task_label: str = None, step_label: str = None):
+        if task_label is not None:
+            self._task_label = task_label
+        if step_label is not None:
+            self._step_label = step_label
+
+    def track(
+        self,
+        iterable: t.Iterable[_T],
+        total: int = None,
+        task_label: str = None,
+        step_label: str = None,
+    ) -> t.Iterator[_T]:
+        """
+        Yield the items of ``iterable``, counting each one as a step. Instead of
+        `next_step()` per item, the counters are updated in batches and the clock
+        is read once per batch, with batch size adjusted to fit about
+        `TRACK_CHECKS_PER_FRAME` batches into a frame interval. The frames are
+        rendered as with `render()`, plus the last one when the iterable is
+        exhausted. If the output is not a terminal, plain `DummyProgressBar`-like
+        lines with the step count are written instead of the frames, at the pipe
+        frame rate. If the length is unknown and ``total`` is not specified, only
+        the step count is shown.
+
+        The overhead is about 60-80ns per item on top of a bare loop, about half
+        of which is the cost of the generator itself; `next_step()` per item
+        costs about 1.5µs.
+        """
+        if total is None:
+            total = len(iterable) if isinstance(iterable, Sized) else 0
+        self.set_labels(task_label, step_label)
+        self._steps_amount = total
+        self._step_num = done = 0
+
+        live = self._ticker is None  # otherwise the ticker renders the frames
+        render_frame = self._get_track_frame_renderer()
+        it = iter(iterable)
+        batch = 1
+        batch_start = time.monotonic_ns()
+        n = -1
         try:
-            self._ensure_next_frame()
-        except _FrameAlreadyRendered:
+            while True:
+                for n, item in zip(range(batch), it):
+                    yield item
+                done += n + 1
+                self._steps_done += n + 1
+                exhausted = n + 1 < batch
+                n = -1
+                self._step_num = done
+                if exhausted:
+                    break
+
+                now = time.monotonic_ns()
+                if live and self._governor.is_due(now, count_dropped=False):
+                    render_frame(now)
+                target_ns = self._governor.interval_ns // self.TRACK_CHECKS_PER_FRAME
+                batch_ns = max(1, now - batch_start)
+                batch = max(1, min(2 * batch, self.TRACK_MAX_BATCH, batch * target_ns // batch_ns))
+                batch_start = now
+            if live:
+                render_frame(time.monotonic_ns())
+        finally:
+            if n >= 0:
+                done += n + 1
+                self._steps_done += n + 1
+            self._step_num = done
+
+    def render(self):
+        if self._ticker:
+            return  # frames are rendered by the ticker thread
+        if not self._governor.is_due(now := time.monotonic_ns()):
             return
+        self._render_frame(now)
 
+    def _render_frame(self, started_ts: int):
+        self._compute_max_label_len()
+        self._icon_frame += 1
+
+        template = self._get_template()
         task_ratio = self._compute_task_progress()
-        field_sep = self._format_field_sep()
-        icon = self._format_icon()
-        task_state = [*self._format_task_state()]
-
-        result = pt.render(
-            pt.Composite(
-                field_sep,
-                icon,
-                field_sep,
-                *task_state,
-                field_sep,
-                *self._format_ratio_bar(task_ratio),
-                field_sep,
-                *self._format_labels(),
-            ),
-            renderer=self._renderer,
+        self._step_rate.update(self._steps_done, started_ts)
+        self._progress_rate.update(self._task_num - 1 + max(0.0, task_ratio), started_ts)
+        step_num = self._format_step_num() + self._format_rate(started_ts)
+
+        result = template.render(
+            self._icon_frame,
+            self._task_num,
+            task_ratio,
+            self._task_label,
+            step_num,
+            self._step_label,
         )
-        left_part_len = len(self.FIELD_SEP) + len(icon) + sum(map(len, task_state))
-
         if self._should_persist():
             delta_str = pt.format_time_ns(time.monotonic_ns() - self._created_at)
-            result_nofmt = pt.render(
-                pt.Composite(
-                    pt.fit(f"+{delta_str}", left_part_len + 1, ">"),
-                    self._format_field_sep(raw=True),
-                    *self._format_ratio_bar(task_ratio, raw=True),
-                    self._format_field_sep(raw=True),
-                    *self._format_labels(raw=True),
-                ),
-                renderer=self._renderer,
+            result_nofmt = template.render_raw(
+                f"+{delta_str}", task_ratio, self._task_label, step_num, self._step_label
             )
             self._echo(result_nofmt, persist=True)
         self._echo(result)
+        self._governor.on_frame_rendered(started_ts, time.monotonic_ns())
+
+    def _get_template(self) -> _FrameTemplate:
+        key = (self._max_label_len, self._get_max_task_num(), self.is_format_allowed)
+        if self._template_key != key:
+            self._template = _FrameTemplate(self, *key)
+            self._template_key = key
+            if self._cell_differ:
+                self._cell_differ.reset()  # the layout has changed
+        return self._template
+
+    def _get_track_frame_renderer(self) -> t.Callable[[int], None]:
+        if self._is_tty():
+            return self._render_frame
+        return self._render_plain_line
+
+    def _render_plain_line(self, started_ts: int):
+        line = f"{pt.get_qname(self)} {self._format_step_num()}{self._step_label}\n"
+        self._io.write(line)
+        self._io.flush()
+        self._bytes_written += len(line.encode())
+        self._governor.on_frame_rendered(started_ts, time.monotonic_ns())
 
     def _echo(self, result: str, persist=False):
         if self.is_format_allowed:
-            # firstly set cursor X to 0, then clear that line,
-            # then echo the result, then clear that line again
-            result = self.OUT_START + result + self.CSI_EL0 + self.SGR_RESET
+            if (diff := self._diff_cells(result, persist)) is not None:
+                result = diff
+            else:
+                # firstly set cursor X to 0, then clear that line,
+                # then echo the result, then clear that line again
+                result = self.OUT_START + result + self.CSI_EL0 + self.SGR_RESET
 
         if self._output_buffer.getvalue():
             # something already waiting in buffer, no need to persist progress:
             self._output_buffer.write(result)
-            self._io.write(self._output_buffer.popvalue().rstrip())
+            result = self._output_buffer.popvalue().rstrip()
             self._update_last_persist_ts()
-        else:
-            self._io.write(result)
 
         if persist:
-            self._io.write("\n")
+            result += "\n"
             self._update_last_persist_ts()
 
+        self._io.write(result)
         self._io.flush()
+        self._bytes_written += len(result.encode())
+
+    def _diff_cells(self, result: str, persist: bool) -> str | None:
+        if not self._cell_differ:
+            return None
+        if persist or self._output_buffer.getvalue():
+            self._cell_differ.reset()  # the line is going to be replaced
+            return None
+        return self._cell_differ.diff(result)
 
     def close(self):
+        if self._ticker:
+            self._ticker.stop()
+            self._ticker = None
+
         self._task_num = self._get_max_task_num()
         self._steps_amount = 0
 
@@ -217,29 +422,15 @@ class ProgressBar:
         return (self._step_num - 1) / self._get_max_step_num()
 
     def _compute_max_label_len(self):
-        if not self._should_query_term_width():
-            return
-
         field_seps_len = 4 * len(self.FIELD_SEP)
         icon_len = len(self.ICON)
         task_state_len = 2 * self._get_max_task_num_len() + len(self.NUM_DELIM)
         task_bar_len = self.BAR_WIDTH + len(self.BORDER_LEFT_CHAR + self.BORDER_RIGHT_CHAR)
 
-        self._max_label_len = pt.get_terminal_width() - (
+        self._max_label_len = get_terminal_width() - (
             field_seps_len + icon_len + task_bar_len + task_state_len + self.LABEL_PAD
         )
 
-    def _ensure_next_frame(self):
-        now = time.monotonic_ns()
-        if not self._next_frame_ts:
-            self._next_frame_ts = now
-
-        if now >= self._next_frame_ts:
-            self._next_frame_ts = now + self.FRAME_INTERVAL_SEC
-            self._icon_frame += 1
-        else:
-            raise _FrameAlreadyRendered
-
     def _should_persist(self) -> bool:
         if self._last_persist_ts is None:
             return True  # first render
@@ -249,102 +440,128 @@ class ProgressBar:
     def _update_last_persist_ts(self):
         self._last_persist_ts = time.monotonic_ns()
 
-    def _should_query_term_width(self) -> bool:
-        now = time.monotonic_ns()
-        if self._last_term_width_query_ts:
-            if now - self._last_term_width_query_ts < self.TERM_WIDTH_QUERY_INTERVAL_SEC:
-                return False
-
-        self._last_term_width_query_ts = now
-        return True
-
-    def _format_field_sep(self, raw=False) -> str:
-        if not self.is_format_allowed or raw:
-            return self.FIELD_SEP
-        return f"{self._styles.DEFAULT.bg.to_sgr(pt.ColorTarget.BG)}{self.FIELD_SEP}"
-
-    def _format_ratio_bar(self, ratio: float, raw=False) -> typing.Iterable[str | pt.Fragment]:
-        filled_length = math.floor(ratio * self.BAR_WIDTH)
-        ratio_label = list(f"{100*ratio:>3.0f}%")
-        ratio_label_len = 4  # "100%"
-        ratio_label_left_pos = (self.BAR_WIDTH - ratio_label_len) // 2
-        ratio_label_perc_pos = ratio_label_left_pos + 3
-
-        if not self.is_format_allowed or raw:
-            bar_chars = filled_length * FULL_BLOCK
-            bar_chars += get_partial_hblock(ratio - filled_length * self.BAR_WIDTH)
-            yield self.BORDER_LEFT_CHAR
-            yield pt.fit(bar_chars, self.BAR_WIDTH)
-            yield from ratio_label
-            return
+    def _is_tty(self) -> bool:
+        try:
+            return self._io.isatty()
+        except (AttributeError, ValueError):
+            return False
+
+    def _format_step_num(self) -> str:
+        if not self._print_step_num:
+            return ""
+        if not self._steps_amount and self._step_num:
+            return f"[{self._step_num}] "  # unknown total
+        return f"[{self._step_num}/{self._steps_amount}] "
+
+    def _format_rate(self, now: int) -> str:
+        if not self._print_rate:
+            return ""
+        rate = self._step_rate.get_rate(now)
+        eta = self._progress_rate.get_eta(self._tasks_amount, now)
+        return f"{format_rate(rate)} {format_eta(eta)} "
+
+
+class JsonProgressBar(ProgressBar):
+    """
+    Machine-readable progress for pipes and log files: one JSON object per
+    line, written at most once per ``min_interval_sec``, plus the final record
+    on `close()` regardless of the interval. Record fields: ``task``, ``tasks``,
+    ``step``, ``steps``, ``ratio`` (overall), ``elapsed`` (sec), ``rate``
+    (steps/sec or *null*), ``task_label``, ``step_label`` and ``final``.
+
+    :param io:               Output stream or file descriptor (not closed
+                             by the bar).
+    :param min_interval_sec: 0 writes a record on every `render()`, which is
+                             incompatible with ``background``.
+    """
 
-        bar_styles = [
-            self._renderer.render("\x00", self._styles.BAR_FILLED).split("\x00", 1)[0],
-            pt.SeqIndex.INVERSED.assemble(),
-        ]
-        label_styles = [
-            pt.SeqIndex.BOLD.assemble(),
-            pt.SeqIndex.DIM.assemble(),
-        ]
+    def __init__(
+        self,
+        io: t.IO | int,
+        tasks_amount=1,
+        task_num=1,
+        task_label="Working",
+        steps_amount=0,
+        step_num=0,
+        step_label="...",
+        min_interval_sec: float = 5.0,
+        background=False,
+    ):
+        if min_interval_sec < 0:
+            raise ValueError(f"Interval must be non-negative, got: {min_interval_sec}")
+        self._unthrottled = min_interval_sec == 0
+        if self._unthrottled:
+            if background:
+                raise ValueError("Unthrottled output cannot be rendered in background")
+            self.MAX_FRAME_RATE = self.PIPE_MAX_FRAME_RATE = math.inf
+            self.MAX_RENDER_LOAD = 1.0
+        else:
+            self.MAX_FRAME_RATE = self.PIPE_MAX_FRAME_RATE = 1 / min_interval_sec
+
+        self._fd_io: t.IO | None = None
+        if isinstance(io, int):
+            io = self._fd_io = open(io, "w", encoding="utf8", closefd=False)
+
+        super().__init__(
+            pt.NoopRenderer(),
+            io,
+            pt.NOOP_COLOR,
+            tasks_amount=tasks_amount,
+            task_num=task_num,
+            task_label=task_label,
+            steps_amount=steps_amount,
+            step_num=step_num,
+            step_label=step_label,
+            background=background,
+        )
 
-        cursor = 0
-        yield pt.Fragment(self.BORDER_LEFT_CHAR, self._styles.BAR_BORDER)
-        yield bar_styles.pop(0)
+    def close(self):
+        if self._ticker:
+            self._ticker.stop()
+            self._ticker = None
 
-        while cursor < self.BAR_WIDTH:
-            if cursor >= filled_length and bar_styles:
-                yield bar_styles.pop()
-            if cursor >= ratio_label_left_pos:
-                if len(label_styles) == 2:
-                    yield label_styles.pop(0)
-                if cursor >= ratio_label_perc_pos and label_styles:
-                    yield label_styles.pop()
-                if len(ratio_label):
-                    cursor += 1
-                    yield ratio_label.pop(0)
-                    continue
-            cursor += 1
-            yield " "
+        if self._output_buffer:
+            self._write_record(time.monotonic_ns(), final=True)
+            self._output_buffer.close()
+            self._output_buffer = None
 
-        if bar_styles:
-            yield bar_styles.pop()
-        yield pt.SeqIndex.INVERSED_OFF.assemble()
-        yield pt.Fragment(self.BORDER_RIGHT_CHAR, self._styles.BAR_BORDER)
-        yield pt.SeqIndex.BOLD_DIM_OFF.assemble()
-
-    def _format_icon(self, raw=False) -> pt.Fragment | str:
-        if not self.is_format_allowed or raw:
-            return " "
-        icon = (self.ICON, " ")[self._icon_frame % 2]
-        return pt.Fragment(icon, self._styles.ICON)
-
-    def _format_task_state(self) -> typing.Iterable[pt.Fragment]:
-        task_num_cur = f"{self._task_num:>{self._get_max_task_num_len()}d}"
-        task_num_max = f"{self._get_max_task_num():<d}"
-
-        yield pt.Fragment(task_num_cur, self._styles.TASK_NUM_CUR)
-        yield pt.Fragment(self.NUM_DELIM, self._styles.TASK_DELIM)
-        yield pt.Fragment(task_num_max, self._styles.TASK_NUM_MAX)
-
-    def _format_labels(self, raw=False) -> typing.Iterable[pt.Fragment]:
-        task_label = self._task_label
-        step_label = self._step_label
-        step_num = ""
-        if self._print_step_num:
-            step_num = f"[{self._step_num}/{self._steps_amount}] "
+        if self._fd_io:
+            self._fd_io.close()
+            self._fd_io = None
 
-        # expand right label to max minus (initial) left
-        label_right_text = pt.fit(
-            step_label,
-            self._max_label_len - self.LABEL_PAD * 2 - len(task_label) - len(step_num),
-            "<",
-        )
-        if not self.is_format_allowed or raw:
-            yield from [task_label, pt.pad(self.LABEL_PAD), step_num, label_right_text]
-            return
-        yield pt.Fragment(f"{task_label}{pt.pad(self.LABEL_PAD)}")
-        yield pt.Fragment(f"{pt.SeqIndex.DIM}{step_num}")
-        yield pt.Fragment(f"{label_right_text}")
+    def render(self):
+        if not self._unthrottled:
+            return super().render()
+        self._render_frame(time.monotonic_ns())
+
+    def _get_track_frame_renderer(self) -> t.Callable[[int], None]:
+        return self._render_frame  # records are meant for non-terminal outputs
+
+    def _render_frame(self, started_ts: int):
+        self._write_record(started_ts)
+        self._governor.on_frame_rendered(started_ts, time.monotonic_ns())
+
+    def _write_record(self, now: int, final=False):
+        self._step_rate.update(self._steps_done, now)
+        task_ratio = max(0.0, self._compute_task_progress())
+        if final and (steps := self._get_max_step_num()):
+            task_ratio = min(1.0, self._step_num / steps)  # last step is done by now
+        ratio = (self._task_num - 1 + task_ratio) / max(1, self._tasks_amount)
+        rate = self._step_rate.get_rate(now)
+        record = {
+            "task": self._task_num,
+            "tasks": self._tasks_amount,
+            "step": self._step_num,
+            "steps": self._steps_amount,
+            "ratio": round(ratio, 4),
+            "elapsed": round((now - self._created_at) / 1e9, 3),
+            "rate": None if rate is None else round(rate, 3),
+            "task_label": self._task_label,
+            "step_label": self._step_label,
+            "final": final,
+        }
+        self._io.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._io.flush()
 
 
 class _PBarStyles(pt.Styles):
@@ -365,8 +582,370 @@ class _PBarStyles(pt.Styles):
         self.BAR_EMPTY = pt.FrozenStyle(fg=self.THEME_COLOR, bg=pt.cv.GRAY_0)
 
 
-class _FrameAlreadyRendered(Exception):
-    pass
+class _FrameTemplate:
+    """
+    Frame layout compiled for the specific label length, task amount and
+    output mode. All the static fragments and escape sequences are rendered
+    in advance, along with the ratio bar variants for each amount of filled
+    cells, so that a frame is assembled with a handful of string joins.
+    """
+
+    def __init__(self, pbar: ProgressBar, max_label_len: int, max_task_num: int, fmt: bool):
+        self._pbar_cls = pbar_cls = type(pbar)
+        self._max_label_len = max_label_len
+        self._task_num_len = len(str(max_task_num))
+        self._fmt = fmt
+
+        styles = pbar._styles
+        render = lambda s, st=pt.NOOP_STYLE: pbar._renderer.render(s, st)
+        render_split = lambda st: render("\x00", st).split("\x00", 1)
+
+        self._field_sep = pbar_cls.FIELD_SEP
+        self._icons = (" ", " ")
+        self._task_num_cur_tpl = "{}"
+        task_num_max = f"{max_task_num:<d}"
+        self._task_state_tail = render(pbar_cls.NUM_DELIM) + render(task_num_max)
+        self._step_num_prefix = ""
+
+        if fmt:
+            self._field_sep = f"{styles.DEFAULT.bg.to_sgr(pt.ColorTarget.BG)}{pbar_cls.FIELD_SEP}"
+            self._icons = (render(pbar_cls.ICON, styles.ICON), render(" ", styles.ICON))
+            self._task_num_cur_tpl = "{}".join(render_split(styles.TASK_NUM_CUR))
+            self._task_state_tail = render(pbar_cls.NUM_DELIM, styles.TASK_DELIM) + render(
+                task_num_max, styles.TASK_NUM_MAX
+            )
+            self._step_num_prefix = str(pt.SeqIndex.DIM)
+
+        bar_width = pbar_cls.BAR_WIDTH
+        self._ratio_label_left_pos = (bar_width - 4) // 2  # len("100%") = 4
+        self._ratio_label_slots = bar_width - self._ratio_label_left_pos
+        self._bar_tpls = [self._compile_bar(pbar, filled) for filled in range(bar_width + 1)]
+        self._left_part_len = (
+            len(pbar_cls.FIELD_SEP)
+            + len(pbar_cls.ICON)
+            + 2 * self._task_num_len
+            + len(pbar_cls.NUM_DELIM)
+        )
+
+    def render(
+        self,
+        icon_frame: int,
+        task_num: int,
+        ratio: float,
+        task_label: str,
+        step_num: str,
+        step_label: str,
+    ) -> str:
+        sep = self._field_sep
+        return "".join(
+            (
+                sep,
+                self._icons[icon_frame % 2],
+                sep,
+                self._task_num_cur_tpl.format(f"{task_num:>{self._task_num_len}d}"),
+                self._task_state_tail,
+                sep,
+                self._render_bar(ratio),
+                sep,
+                self._render_labels(task_label, step_num, step_label),
+            )
+        )
+
+    def render_raw(
+        self,
+        prefix: str,
+        ratio: float,
+        task_label: str,
+        step_num: str,
+        step_label: str,
+    ) -> str:
+        sep = self._pbar_cls.FIELD_SEP
+        return "".join(
+            (
+                pt.fit(prefix, self._left_part_len + 1, ">"),
+                sep,
+                self._render_bar_raw(ratio),
+                sep,
+                self._render_labels(task_label, step_num, step_label, raw=True),
+            )
+        )
+
+    def _render_bar(self, ratio: float) -> str:
+        if not self._fmt:
+            return self._render_bar_raw(ratio)
+        bar_width = self._pbar_cls.BAR_WIDTH
+        filled_length = max(0, min(bar_width, math.floor(ratio * bar_width)))
+        slots = self._ratio_label_slots
+        ratio_label = f"{100*ratio:>3.0f}%"[:slots].ljust(slots)
+        return self._bar_tpls[filled_length].format(*ratio_label)
+
+    def _render_bar_raw(self, ratio: float) -> str:
+        bar_width = self._pbar_cls.BAR_WIDTH
+        filled_length = math.floor(ratio * bar_width)
+        bar_chars = filled_length * FULL_BLOCK
+        bar_chars += get_partial_hblock(ratio - filled_length * bar_width)
+        border_left = self._pbar_cls.BORDER_LEFT_CHAR
+        return border_left + pt.fit(bar_chars, bar_width) + f"{100*ratio:>3.0f}%"
+
+    def _render_labels(self, task_label: str, step_num: str, step_label: str, raw=False) -> str:
+        pad = pt.pad(self._pbar_cls.LABEL_PAD)
+        # expand right label to max minus (initial) left
+        label_right_text = pt.fit(
+            step_label,
+            self._max_label_len - self._pbar_cls.LABEL_PAD * 2 - len(task_label) - len(step_num),
+            "<",
+        )
+        if raw:
+            return task_label + pad + step_num + label_right_text
+        return task_label + pad + self._step_num_prefix + step_num + label_right_text
+
+    def _compile_bar(self, pbar: ProgressBar, filled_length: int) -> str:
+        """
+        :return: Format string with one positional field per ratio label char.
+        """
+        styles = pbar._styles
+        pbar_cls = self._pbar_cls
+        bar_styles = [
+            pbar._renderer.render("\x00", styles.BAR_FILLED).split("\x00", 1)[0],
+            pt.SeqIndex.INVERSED.assemble(),
+        ]
+        label_styles = [
+            pt.SeqIndex.BOLD.assemble(),
+            pt.SeqIndex.DIM.assemble(),
+        ]
+        esc = lambda s: s.replace("{", "{{").replace("}", "}}")
+        ratio_label_perc_pos = self._ratio_label_left_pos + 3
+
+        result = esc(pbar._renderer.render(pbar_cls.BORDER_LEFT_CHAR, styles.BAR_BORDER))
+        result += esc(bar_styles.pop(0))
+
+        for cursor in range(pbar_cls.BAR_WIDTH):
+            if cursor >= filled_length and bar_styles:
+                result += esc(bar_styles.pop())
+            if cursor >= self._ratio_label_left_pos:
+                if len(label_styles) == 2:
+                    result += esc(label_styles.pop(0))
+                if cursor >= ratio_label_perc_pos and label_styles:
+                    result += esc(label_styles.pop())
+                result += "{%d}" % (cursor - self._ratio_label_left_pos)
+                continue
+            result += " "
+
+        if bar_styles:
+            result += esc(bar_styles.pop())
+        result += esc(pt.SeqIndex.INVERSED_OFF.assemble())
+        result += esc(pbar._renderer.render(pbar_cls.BORDER_RIGHT_CHAR, styles.BAR_BORDER))
+        result += esc(pt.SeqIndex.BOLD_DIM_OFF.assemble())
+        return result
+
+
+class _CellDiffer:
+    """
+    Keeps the cells of the last emitted line, each one being a character and
+    the effective SGR state it was printed with, and turns the next line into
+    the changed spans only. Every span starts with a cursor column move and a
+    single sequence setting the full state of its first cell; spans separated
+    by a few unchanged cells are merged when rewriting the latter is cheaper
+    than a jump.
+    """
+
+    SGR_REGEX = re.compile(R"(\x1b\[[\d;:]*m)")
+
+    # fmt: off
+    _FLAGS = {  # param: (flag index, value)
+        1: (0, True),  2: (1, True),  22: (0, False),
+        3: (2, True),  23: (2, False),
+        4: (3, True),  24: (3, False),
+        5: (4, True),  25: (4, False),
+        7: (5, True),  27: (5, False),
+    }
+    _FLAG_CODES = ("1", "2", "3", "4", "5", "7")
+    # fmt: on
+    _DEFAULT_STATE = (False, False, False, False, False, False, "", "", ())
+    """ bold, dim, italic, underline, blink, inversed, fg, bg, unknown params """
+
+    def __init__(self):
+        self._cells: list[tuple[tuple, str, str]] | None = None
+        """ (sgr state, sgr sequences preceding the cell, char) """
+        self._transitions: dict[tuple[tuple, str], tuple] = {}
+        self._encoded: dict[tuple, str] = {}
+        self._cha_cache: dict[int, str] = {}
+
+    def reset(self):
+        self._cells = None
+
+    def diff(self, line: str) -> str | None:
+        """
+        :return: Sequences and characters transforming the last line into
+                 ``line``, or *None* if a full redraw is required.
+        """
+        old, self._cells = self._cells, (new := self._parse(line))
+        if old is None or new is None:
+            return None
+
+        out = []
+        same = lambda k: k < len(old) and old[k][0] == new[k][0] and old[k][2] == new[k][2]
+        idx = 0
+        while idx < len(new):
+            if same(idx):
+                idx += 1
+                continue
+            out += [self._get_cha(idx), self._encode(new[idx][0]), new[idx][2]]
+            idx += 1
+            while idx < len(new):
+                if not same(idx):
+                    out += new[idx][1:]
+                    idx += 1
+                    continue
+                gap_end = idx
+                while gap_end < len(new) and same(gap_end):
+                    gap_end += 1
+                if gap_end == len(new):
+                    break
+                gap = [part for cell in new[idx:gap_end] for part in cell[1:]]
+                jump_len = len(self._get_cha(gap_end)) + len(self._encode(new[gap_end][0]))
+                if sum(map(len, gap)) > jump_len:
+                    break
+                out += gap
+                idx = gap_end
+
+        if len(new) < len(old):
+            out += [self._get_cha(len(new)), ProgressBar.CSI_EL0]
+        if out:
+            out.append(ProgressBar.SGR_RESET)
+        return "".join(out)
+
+    def _parse(self, line: str) -> list[tuple[tuple, str, str]] | None:
+        cells = []
+        state = self._DEFAULT_STATE
+        delta = ""
+        for idx, part in enumerate(self.SGR_REGEX.split(line)):
+            if idx % 2:
+                if (next_state := self._transitions.get((state, part))) is None:
+                    next_state = self._transitions[(state, part)] = self._apply(state, part)
+                state = next_state
+                delta += part
+                continue
+            if "\x1b" in part:
+                return None  # not a plain SGR sequence
+            for char in part:
+                cells.append((state, delta, char))
+                delta = ""
+        return cells
+
+    def _apply(self, state: tuple, seq: str) -> tuple:
+        flags, fg, bg, unknown = [*state[:6]], state[6], state[7], state[8]
+        params = seq[2:-1].split(";")
+        idx = 0
+        while idx < len(params):
+            param = params[idx]
+            code = int(param) if param.isdigit() else -1
+            idx += 1
+            if param == "" or code == 0:
+                flags, fg, bg, unknown = [*self._DEFAULT_STATE[:6]], "", "", ()
+            elif code in self._FLAGS:
+                flag_idx, value = self._FLAGS[code]
+                flags[flag_idx] = value
+                if code == 22:
+                    flags[1] = False
+            elif code in (38, 48):
+                ext_len = {"5": 2, "2": 4}.get(params[idx] if idx < len(params) else "", 0)
+                color = ";".join(params[idx - 1 : idx + ext_len])
+                idx += ext_len
+                fg, bg = (color, bg) if code == 38 else (fg, color)
+            elif code == 39 or 30 <= code <= 37 or 90 <= code <= 97:
+                fg = "" if code == 39 else param
+            elif code == 49 or 40 <= code <= 47 or 100 <= code <= 107:
+                bg = "" if code == 49 else param
+            else:
+                unknown = (*unknown, param)
+        return (*flags, fg, bg, unknown)
+
+    def _encode(self, state: tuple) -> str:
+        if (seq := self._encoded.get(state)) is None:
+            params = ["0"]
+            params += (code for code, flag in zip(self._FLAG_CODES, state[:6]) if flag)
+            params += (color for color in state[6:8] if color)
+            params += state[8]
+            seq = self._encoded[state] = f"\x1b[{';'.join(params)}m"
+        return seq
+
+    def _get_cha(self, idx: int) -> str:
+        if (cha := self._cha_cache.get(idx)) is None:
+            cha = self._cha_cache[idx] = pt.make_set_cursor_column(idx + 1).assemble()
+        return cha
+
+
+class _FrameGovernor:
+    """
+    Frame pacing in nanoseconds. The interval between the frames starts from
+    the one corresponding to the max frame rate and is stretched whenever the
+    measured (EWMA) cost of rendering and writing a frame exceeds ``max_load``
+    share of it, which happens on slow terminals or SSH links with blocking
+    writes; the frame rate is never lowered below ``min_frame_rate``.
+    """
+
+    COST_EWMA_ALPHA = 0.2
+
+    def __init__(self, max_frame_rate: float, min_frame_rate: float, max_load: float):
+        self._min_interval_ns = int(1e9 / max_frame_rate)
+        self._max_interval_ns = max(self._min_interval_ns, int(1e9 / min_frame_rate))
+        self._max_load = max_load
+
+        self._interval_ns = self._min_interval_ns
+        self._cost_ns: float | None = None
+        self._next_frame_ts: int | None = None
+
+        self.rendered_frames = 0
+        self.dropped_frames = 0
+
+    @property
+    def interval_ns(self) -> int:
+        return self._interval_ns
+
+    @property
+    def effective_fps(self) -> float:
+        return 1e9 / self._interval_ns
+
+    def is_due(self, now: int, count_dropped=True) -> bool:
+        if self._next_frame_ts is None or now >= self._next_frame_ts:
+            return True
+        if count_dropped:
+            self.dropped_frames += 1
+        return False
+
+    def on_frame_rendered(self, started_ts: int, finished_ts: int):
+        cost_ns = finished_ts - started_ts
+        if self._cost_ns is None:
+            self._cost_ns = cost_ns
+        else:
+            self._cost_ns += self.COST_EWMA_ALPHA * (cost_ns - self._cost_ns)
+
+        self._interval_ns = int(
+            max(self._min_interval_ns, min(self._max_interval_ns, self._cost_ns / self._max_load))
+        )
+        self._next_frame_ts = started_ts + self._interval_ns
+        self.rendered_frames += 1
+
+
+class _RenderTicker(threading.Thread):
+    def __init__(self, pbar: ProgressBar):
+        super().__init__(name=f"{pt.get_qname(pbar)}:ticker", daemon=True)
+        self._pbar = pbar
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                self._pbar._render_frame(time.monotonic_ns())
+                self._stop_event.wait(self._pbar._governor.interval_ns / 1e9)
+        except Exception as e:  # pragma: no cover
+            logger.exception(e)
+
+    def stop(self):
+        self._stop_event.set()
+        if self is not threading.current_thread():
+            self.join()
 
 
 class _OutputBuffer(StringIO):
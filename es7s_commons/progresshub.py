@@ -0,0 +1,339 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
+from __future__ import annotations
+
+import concurrent.futures
+import itertools
+import multiprocessing
+import threading
+import typing as t
+from abc import ABCMeta, abstractmethod
+from multiprocessing import shared_memory
+from multiprocessing.context import BaseContext
+
+from .progressbar import ProgressBar
+
+_label_seq = itertools.count()
+
+
+class ProgressHandle:
+    """
+    Per-thread progress counters. Each handle is written by one thread only,
+    so the updates are plain attribute writes without any locking; the hub
+    owner reads them (possibly slightly stale) when rendering.
+    """
+
+    def __init__(self):
+        self._tasks_done = 0
+        self._steps_done = 0
+        self._task_label: tuple[int, str] | None = None
+        self._step_label: tuple[int, str] | None = None
+
+    def next_task(self, task_label: str = None):
+        self._tasks_done += 1
+        if task_label is not None:
+            self._task_label = (next(_label_seq), task_label)
+
+    def next_step(self, step_label: str = None, amount: int = 1):
+        self._steps_done += amount
+        if step_label is not None:
+            self._step_label = (next(_label_seq), step_label)
+
+
+class _ProgressHubBase(metaclass=ABCMeta):
+    def __init__(self, pbar: ProgressBar, tasks_amount: int = 1, steps_amount: int = 0):
+        self._pbar = pbar
+        self._tasks_amount = tasks_amount
+        self._steps_amount = steps_amount
+
+    def render(self):
+        self._sync()
+        self._pbar.render()
+
+    def wait(
+        self,
+        futures: t.Iterable[concurrent.futures.Future],
+        timeout: float = None,
+    ) -> set[concurrent.futures.Future]:
+        """
+        Wait for the ``futures`` to complete, rendering the combined progress
+        at the progress bar frame rate in the meantime.
+
+        :return: Completed futures.
+        """
+        pending = set(futures)
+        done: set[concurrent.futures.Future] = set()
+        remaining = timeout
+        while pending and (remaining is None or remaining > 0):
+            interval = self._pbar.frame_interval_sec
+            just_done, pending = concurrent.futures.wait(pending, timeout=interval)
+            done |= just_done
+            self.render()
+            if remaining is not None:
+                remaining -= interval
+        return done
+
+    def close(self):
+        self._sync()
+        self._pbar.close()
+
+    @abstractmethod
+    def _sync(self):
+        ...
+
+    def _apply(
+        self,
+        tasks_done: int,
+        steps_done: int,
+        steps_amount: int,
+        task_label: str | None,
+        step_label: str | None,
+    ):
+        self._pbar.init_tasks(self._tasks_amount, task_num=1 + tasks_done)
+        self._pbar.init_steps(steps_amount, step_num=steps_done)
+        self._pbar.steps_done = steps_done
+        self._pbar.set_labels(task_label, step_label)
+
+
+class ProgressHub(_ProgressHubBase):
+    """
+    Aggregates progress reported by worker threads into a single `ProgressBar`.
+    Workers call `get_handle()` once and then update their own counters; only
+    the owner thread (the one calling `render()`, `wait()` and `close()`)
+    touches the progress bar and the output stream.
+
+    >>> with ThreadPoolExecutor() as executor:
+    >>>     hub = ProgressHub(pbar, steps_amount=len(items))
+    >>>     futures = [executor.submit(work, hub, item) for item in items]
+    >>>     hub.wait(futures)
+    >>>     hub.close()
+    """
+
+    def __init__(self, pbar: ProgressBar, tasks_amount: int = 1, steps_amount: int = 0):
+        super().__init__(pbar, tasks_amount, steps_amount)
+        self._handles: list[ProgressHandle] = []
+        self._handles_lock = threading.Lock()
+        self._local = threading.local()
+
+    def get_handle(self) -> ProgressHandle:
+        """Return the calling thread's handle, creating it on the first call."""
+        if (handle := getattr(self._local, "handle", None)) is None:
+            handle = self._local.handle = ProgressHandle()
+            with self._handles_lock:
+                self._handles.append(handle)
+        return handle
+
+    def _sync(self):
+        with self._handles_lock:
+            handles = [*self._handles]
+        self._apply(
+            sum(h._tasks_done for h in handles),
+            sum(h._steps_done for h in handles),
+            self._steps_amount,
+            self._get_last_label(h._task_label for h in handles),
+            self._get_last_label(h._step_label for h in handles),
+        )
+
+    @staticmethod
+    def _get_last_label(labels: t.Iterable[tuple[int, str] | None]) -> str | None:
+        if last := max(filter(None, labels), default=None):
+            return last[1]
+        return None
+
+
+class SharedProgressHandle:
+    """
+    Worker side of `SharedProgressHub`: a fixed-layout slot in a shared memory
+    block, updated in place without any IPC round-trips. The handle is
+    picklable and attaches to the block lazily in the process using it.
+    """
+
+    HEADER_SIZE = 8  # u64 amount of claimed slots
+    LABEL_SIZE = 88
+
+    # fmt: off
+    _TASKS_DONE        = 0
+    _STEPS_DONE        = 1
+    _STEPS_AMOUNT      = 2
+    _TASK_LABEL_SEQ    = 3
+    _TASK_LABEL_LEN    = 4
+    _STEP_LABEL_SEQ    = 5
+    _STEP_LABEL_LEN    = 6
+    _TASK_LABEL_OFFSET = 7 * 8
+    _STEP_LABEL_OFFSET = _TASK_LABEL_OFFSET + LABEL_SIZE
+    _LABEL_LAYOUT = {
+        "task": (_TASK_LABEL_SEQ, _TASK_LABEL_LEN, _TASK_LABEL_OFFSET),
+        "step": (_STEP_LABEL_SEQ, _STEP_LABEL_LEN, _STEP_LABEL_OFFSET),
+    }
+    # fmt: on
+    SLOT_SIZE = _STEP_LABEL_OFFSET + LABEL_SIZE  # multiple of 8
+
+    def __init__(self, shm_name: str, slot: int):
+        self._shm_name = shm_name
+        self._slot = slot
+        self._shm: shared_memory.SharedMemory | None = None
+        self._counters: memoryview | None = None
+
+    def __getstate__(self) -> dict:
+        return dict(shm_name=self._shm_name, slot=self._slot)
+
+    def __setstate__(self, state: dict):
+        self.__init__(state["shm_name"], state["slot"])
+
+    def next_task(self, task_label: str = None):
+        self._get_counters()[self._TASKS_DONE] += 1
+        if task_label is not None:
+            self._set_label(task_label, "task")
+
+    def init_steps(self, steps_amount: int):
+        """
+        Announce ``steps_amount`` more steps, e.g. of the next task. Steps are
+        counted over all the tasks of the worker, and so are the amounts.
+        """
+        self._get_counters()[self._STEPS_AMOUNT] += steps_amount
+
+    def next_step(self, step_label: str = None, amount: int = 1):
+        self._get_counters()[self._STEPS_DONE] += amount
+        if step_label is not None:
+            self._set_label(step_label, "step")
+
+    def close(self):
+        """Detach from the shared memory block (the hub owner unlinks it)."""
+        if self._counters is not None:
+            self._counters.release()
+            self._counters = None
+            self._shm.close()
+            self._shm = None
+
+    def _set_label(self, label: str, kind: str):
+        seq_idx, len_idx, label_offset = self._LABEL_LAYOUT[kind]
+        counters = self._get_counters()
+        encoded = label.encode("utf8")
+        if len(encoded) > self.LABEL_SIZE:  # do not cut a multibyte character in half
+            encoded = encoded[: self.LABEL_SIZE].decode("utf8", "ignore").encode("utf8")
+        offset = self.get_slot_offset(self._slot) + label_offset
+        self._shm.buf[offset : offset + len(encoded)] = encoded
+        counters[len_idx] = len(encoded)
+        counters[seq_idx] += 1
+
+    def _get_counters(self) -> memoryview:
+        if self._counters is None:
+            self._shm = _attach_shm(self._shm_name)
+            offset = self.get_slot_offset(self._slot)
+            self._counters = self._shm.buf[offset : offset + self._TASK_LABEL_OFFSET].cast("Q")
+        return self._counters
+
+    @classmethod
+    def get_slot_offset(cls, slot: int) -> int:
+        return cls.HEADER_SIZE + slot * cls.SLOT_SIZE
+
+
+class SharedProgressHub(_ProgressHubBase):
+    """
+    Cross-process counterpart of `ProgressHub` based on
+    `multiprocessing.shared_memory`. Each worker process owns one slot with
+    its counters and last labels, and the parent renders their sum with the
+    regular `ProgressBar`.
+
+    >>> hub = SharedProgressHub(pbar, workers=4, steps_amount=len(items))
+    >>> with ProcessPoolExecutor(4, initializer=hub.init_worker, initargs=hub.initargs) as ex:
+    >>>     futures = [ex.submit(work, item) for item in items]  # calls get_worker_handle()
+    >>>     hub.wait(futures)
+    >>> hub.close()
+
+    Processes started manually can be given a handle with `get_handle()` instead.
+    The slot lock is created within ``mp_context``, which should be the one
+    the pool is using. If ``steps_amount`` is 0, the sum of all the amounts
+    passed to `init_steps()` by the workers is used.
+    """
+
+    _worker_handle: SharedProgressHandle | None = None
+    """ Handle of the current worker process (set up by `init_worker()`). """
+
+    def __init__(
+        self,
+        pbar: ProgressBar,
+        workers: int,
+        tasks_amount: int = 1,
+        steps_amount: int = 0,
+        mp_context: BaseContext = None,
+    ):
+        super().__init__(pbar, tasks_amount, steps_amount)
+        self._slots = workers
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=SharedProgressHandle.get_slot_offset(workers)
+        )
+        self._shm.buf[:] = bytes(self._shm.size)
+        self._slot_lock = (mp_context or multiprocessing).Lock()
+        self._label_seqs = {kind: [0] * workers for kind in SharedProgressHandle._LABEL_LAYOUT}
+        self._labels: dict[str, str | None] = dict.fromkeys(SharedProgressHandle._LABEL_LAYOUT)
+
+    @property
+    def initargs(self) -> tuple:
+        return self._shm.name, self._slots, self._slot_lock
+
+    @staticmethod
+    def init_worker(shm_name: str, slots: int, slot_lock: multiprocessing.Lock):
+        """Process pool initializer, claims a slot for the current process."""
+        slot = _claim_slot(_attach_shm(shm_name), slots, slot_lock)
+        SharedProgressHub._worker_handle = SharedProgressHandle(shm_name, slot)
+
+    @staticmethod
+    def get_worker_handle() -> SharedProgressHandle:
+        if (handle := SharedProgressHub._worker_handle) is None:
+            raise RuntimeError("Worker is not initialized, see SharedProgressHub.init_worker()")
+        return handle
+
+    def get_handle(self) -> SharedProgressHandle:
+        """Claim a slot for a manually started process."""
+        slot = _claim_slot(self._shm, self._slots, self._slot_lock)
+        return SharedProgressHandle(self._shm.name, slot)
+
+    def close(self):
+        super().close()
+        self._shm.close()
+        self._shm.unlink()
+
+    def _sync(self):
+        h = SharedProgressHandle
+        slot_len = h.SLOT_SIZE // 8
+        counters = self._shm.buf[h.HEADER_SIZE :].cast("Q")
+        tasks_done = steps_done = steps_amount = 0
+
+        for slot in range(self._slots):
+            base = slot * slot_len
+            tasks_done += counters[base + h._TASKS_DONE]
+            steps_done += counters[base + h._STEPS_DONE]
+            steps_amount += counters[base + h._STEPS_AMOUNT]
+            for kind, (seq_idx, len_idx, label_offset) in h._LABEL_LAYOUT.items():
+                if (label_seq := counters[base + seq_idx]) == self._label_seqs[kind][slot]:
+                    continue
+                self._label_seqs[kind][slot] = label_seq
+                label_len = min(h.LABEL_SIZE, counters[base + len_idx])
+                offset = h.get_slot_offset(slot) + label_offset
+                label = bytes(self._shm.buf[offset : offset + label_len])
+                self._labels[kind] = label.decode("utf8", "replace")
+        counters.release()
+
+        steps_amount = self._steps_amount or steps_amount
+        self._apply(tasks_done, steps_done, steps_amount, *self._labels.values())
+
+
+def _claim_slot(shm: shared_memory.SharedMemory, slots: int, lock: multiprocessing.Lock) -> int:
+    with lock:
+        header = shm.buf[: SharedProgressHandle.HEADER_SIZE].cast("Q")
+        try:
+            if (slot := header[0]) >= slots:
+                raise RuntimeError(f"All {slots} progress slots are taken")
+            header[0] += 1
+        finally:
+            header.release()
+    return slot
+
+
+def _attach_shm(name: str) -> shared_memory.SharedMemory:
+    # workers share the resource tracker of the parent process, so the repeated
+    # registration made here is a no-op and the block is unlinked only once
+    return shared_memory.SharedMemory(name)
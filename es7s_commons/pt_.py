@@ -4,10 +4,14 @@
 # ------------------------------------------------------------------------------
 from __future__ import annotations
 
+import bisect
+import copy
 import io
+import itertools
 import os
 import typing as t
 from collections import deque
+from dataclasses import dataclass, field
 from math import ceil
 from pathlib import Path
 
@@ -37,6 +41,8 @@ class AdaptiveFragment(pt.Fragment):
         super().__init__(string, fmt)
         self._min_len = min_len
         self._collapse_lvl = 0
+        self._margins: tuple[int, int] = (0, 0)
+        self._margins_of: str | None = None
 
     def collapse(self, lvl: int = 0):
         self._collapse_lvl = lvl
@@ -47,7 +53,52 @@ class AdaptiveFragment(pt.Fragment):
         return collapse_fn(self._string)(self.COLLAPSE_CHAR)
 
     def delta_collapse(self, lvl: int = 0) -> int:
-        return len(self._string) - len(self.collapsed(lvl))
+        """Same as ``len(self) - len(self.collapsed(lvl))``, without building the string."""
+        return sum(self._get_collapse_cuts(lvl, len(self._string), *self._get_margins()))
+
+    @staticmethod
+    def _get_collapse_cuts(lvl: int, length: int, lead: int, trail: int) -> tuple[int, int]:
+        """
+        :return: Amounts of chars cut from the start and from the end of a string
+                 with given length and margins when it is collapsed at ``lvl``.
+        """
+        if lead == length:  # blank string, margins overlap
+            return (min(1, lead) if lvl in (1, 2) else lead), 0
+        match lvl:
+            case 1:
+                return min(1, lead), 0
+            case 2:
+                return 0, min(1, trail)
+            case 3:
+                return lead, 0
+            case 4:
+                return 0, trail
+        return lead, trail
+
+    def _get_margins(self) -> tuple[int, int]:
+        """
+        :return: Amounts of leading and trailing collapsible chars, which are
+                 recounted only when the string gets replaced.
+        """
+        if self._margins_of is not self._string:
+            self._margins = self._count_margins(self._string)
+            self._margins_of = self._string
+        return self._margins
+
+    @classmethod
+    def _count_margins(cls, string: str) -> tuple[int, int]:
+        lead = len(string)
+        for idx, c in enumerate(string):
+            if c != cls.COLLAPSE_CHAR:
+                lead = idx
+                break
+        trail = lead
+        if lead < len(string):
+            for idx, c in enumerate(reversed(string)):
+                if c != cls.COLLAPSE_CHAR:
+                    trail = idx
+                    break
+        return lead, trail
 
     @property
     def collapse_lvl(self) -> int:
@@ -59,14 +110,243 @@ class AdaptiveFragment(pt.Fragment):
     def shrinked(self) -> str:
         return self._string[: self._min_len]
 
-    def delta_shrink(self):
-        return len(self._string) - len(self.shrinked())
+    def delta_shrink(self) -> int:
+        return max(0, len(self._string) - self._min_len)
 
 
 _AF = AdaptiveFragment
 _DC = DisposableComposite
 
 
+@dataclass
+class CompressionStep:
+    """Compression level applied by `CompositeCompressor`, with the parts it affected."""
+
+    level: str
+    """ One of: purge, collapse, shrink, chop, eviscerate. """
+    sublevel: int
+    """ Collapse level, 0 for the others. """
+    length: int
+    """ Total length after the level has been applied. """
+    removed: list[pt.IRenderable] = field(default_factory=list)
+    modified: list[pt.Fragment] = field(default_factory=list)
+
+
+class _CompressionPlan:
+    """
+    Compression of the parts worked out without touching them: the new strings
+    of the fragments are recorded by part id, as shared instances have a common
+    string, and the removed parts by their positions; all of it is applied in
+    one pass afterwards.
+    """
+
+    # fmt: off
+    LEVEL_NUMS = {
+        "purge":      "I",
+        "collapse":   "II",
+        "shrink":     "III",
+        "chop":       "IV",
+        "eviscerate": "V",
+    }
+    # fmt: on
+
+    def __init__(self, parts: t.Sequence[pt.IRenderable], log: bool = False):
+        self.parts = [*parts]
+        self.log = log
+        self.strings: dict[int, str] = {}
+        self.collapse_lvls: dict[int, int] = {}
+        self.removed: set[int] = set()
+        self.steps: list[CompressionStep] = []
+
+        # the same instance can occur several times (e.g. a separator), and then
+        # a change of its string affects the length of every occurrence:
+        self.counts: dict[int, int] = {}
+        self.positions: dict[int, list[int]] = {}
+        self.next_idx: dict[int, int] = {}
+        """ Where to start looking for the first remaining occurrence in `positions`. """
+
+        # lengths are measured once here and then updated with the deltas of
+        # each applied level instead of being recounted over all the parts:
+        self.total_len = 0
+        self.disposables: list[_DC] = []
+        self.disposables_len = 0
+        self.adaptives: list[_AF] = []
+        self.fragments: list[pt.Fragment] = []
+        self.fragments_len = 0
+        self.pack_lvl = 1
+
+        for pos, part in enumerate(self.parts):
+            self.positions.setdefault(id(part), []).append(pos)
+            self.total_len += (part_len := len(part))
+            if isinstance(part, _DC):
+                self.disposables.append(part)
+                self.disposables_len += part_len
+            elif isinstance(part, _AF):
+                self.adaptives.append(part)
+                self.fragments.append(part)
+                self.fragments_len += part_len
+            elif isinstance(part, pt.Fragment):
+                self.fragments.append(part)
+                self.fragments_len += part_len
+        self.occurrences = {part_id: len(pp) for part_id, pp in self.positions.items()}
+        self.counts = {**self.occurrences}
+
+    def copy(self) -> _CompressionPlan:
+        plan = copy.copy(self)  # part lists are replaced by the levels, never modified
+        plan.strings = {**self.strings}
+        plan.collapse_lvls = {**self.collapse_lvls}
+        plan.removed = {*self.removed}
+        plan.counts = {**self.counts}
+        plan.next_idx = {**self.next_idx}
+        plan.steps = [*self.steps]
+        return plan
+
+    def run(self, max_len: int):
+        while (req_delta := self.total_len - max_len) > 0:
+            if not self.apply_next_level(req_delta, max_len):
+                break
+
+    def apply_next_level(self, req_delta: int, max_len: int) -> bool:
+        """:return: *False* if there is nothing left to apply after this level."""
+        if self.disposables_len:
+            self._purge(req_delta)
+        elif self.pack_lvl < _AF.COLLAPSE_MAX_LVL and self._collapse(self.pack_lvl):
+            self.pack_lvl += 1
+        elif not self._shrink():
+            if not self.fragments_len:
+                self._eviscerate(max_len)
+                return False  # от греха
+            self._chop(req_delta)
+        return True
+
+    def add_step(self, level: str, removed=(), modified=(), sublevel=0):
+        step = CompressionStep(level, sublevel, self.total_len, [*removed], [*modified])
+        self.steps.append(step)
+        if not self.log:
+            return
+        level_num = self.LEVEL_NUMS[level] + (f" ({sublevel})" if sublevel else "")
+        logger.debug(f"Level {level_num} compression applied: length {self.total_len}")
+
+    def get_string(self, f: pt.Fragment) -> str:
+        return self.strings.get(id(f), f._string)
+
+    def get_len(self, part: pt.IRenderable) -> int:
+        if (string := self.strings.get(id(part))) is not None:
+            return len(string)
+        return len(part)
+
+    def _set_string(self, f: pt.Fragment, string: str):
+        delta = len(self.get_string(f)) - len(string)
+        self.strings[id(f)] = string
+        self.total_len -= delta * self.counts[id(f)]
+        if self.fragments:  # every occurrence is listed until the chopping
+            self.fragments_len -= delta * self.occurrences[id(f)]
+
+    def _remove(self, part: pt.IRenderable, pos: int = None):
+        """Remove the occurrence at ``pos``, or the first remaining one."""
+        if pos is None:
+            positions = self.positions[id(part)]
+            idx = self.next_idx.get(id(part), 0)
+            while positions[idx] in self.removed:
+                idx += 1
+            self.next_idx[id(part)] = idx + 1
+            pos = positions[idx]
+        self.removed.add(pos)
+        self.counts[id(part)] -= 1
+        self.total_len -= self.get_len(part)
+
+    def _purge(self, req_delta: int):
+        disposables = self.disposables
+        if req_delta - self.disposables_len <= 0:
+            disposables = []
+            for d in sorted(self.disposables, key=lambda D: -len(D)):
+                if req_delta <= 0:
+                    break
+                req_delta -= len(d)
+                disposables.append(d)
+
+        for d in disposables:
+            self._remove(d)
+        self.add_step("purge", removed=disposables)
+        self.disposables = []
+        self.disposables_len = 0
+
+    def _get_collapse_cuts(self, af: _AF, string: str, lvl: int) -> tuple[int, int]:
+        if string is af._string:
+            margins = af._get_margins()
+        else:
+            margins = _AF._count_margins(string)
+        return _AF._get_collapse_cuts(lvl, len(string), *margins)
+
+    def _collapse(self, lvl: int) -> bool:
+        """:return: *False* if there is nothing to collapse, and nothing was applied."""
+        if not any(
+            sum(self._get_collapse_cuts(af, self.get_string(af), lvl)) for af in self.adaptives
+        ):
+            return False
+
+        # a shared fragment is collapsed once per occurrence, just as it would
+        # have been by calling `AdaptiveFragment.collapse()` on each of them:
+        modified = []
+        for af in self.adaptives:
+            self.collapse_lvls[id(af)] = lvl
+            string = self.get_string(af)
+            lead, trail = self._get_collapse_cuts(af, string, lvl)
+            if lead or trail:
+                self._set_string(af, string[lead : len(string) - trail])
+                modified.append(af)
+        self.add_step("collapse", modified=modified, sublevel=lvl)
+        return True
+
+    def _shrink(self) -> bool:
+        """:return: *False* if there is nothing to shrink, and nothing was applied."""
+        modified = []
+        for af in self.adaptives:
+            if len(string := self.get_string(af)) > af._min_len:
+                self._set_string(af, string[: af._min_len])
+                modified.append(af)
+        if not modified:
+            return False
+
+        self.add_step("shrink", modified=modified)
+        self.adaptives = []
+        return True
+
+    def _chop(self, req_delta: int):
+        removed, modified = [], []
+        if req_delta - self.fragments_len > 0:
+            removed = self.fragments
+        else:
+            chop_ratio = req_delta / len(self.fragments)
+            for f in self.fragments:
+                if req_delta <= 0:
+                    break
+                string = self.get_string(f)
+                req_delta -= (chop := ceil(len(string) * chop_ratio))
+                if chop >= len(string):
+                    removed.append(f)
+                else:
+                    self._set_string(f, string[:-chop])
+                    modified.append(f)
+
+        for f in removed:
+            self._remove(f)
+        self.add_step("chop", removed=removed, modified=modified)
+        self.fragments = []
+        self.fragments_len = 0
+
+    def _eviscerate(self, max_len: int):
+        removed = []
+        for pos in range(len(self.parts) - 1, -1, -1):
+            if self.total_len <= max_len:
+                break
+            if pos in self.removed:
+                continue
+            self._remove(part := self.parts[pos], pos)
+            removed.append(part)
+        self.add_step("eviscerate", removed=removed)
+
+
 class CompositeCompressor(pt.Composite):
     def __init__(self, *parts: pt.RT):
         super().__init__(*parts)
@@ -77,7 +357,7 @@ class CompositeCompressor(pt.Composite):
     def extend(self, parts: t.Iterable[pt.RT]):
         self._parts.extend(parts)
 
-    def compress(self, max_len: int):
+    def compress(self, max_len: int) -> list[CompressionStep]:
         """
         5 levels of elements compression, from almost transparent to monstrously barbaric:
 
@@ -92,100 +372,143 @@ class CompositeCompressor(pt.Composite):
         * eviscerate  throw away the rightmost fragments entirely, which is the only remaining
                       method if the external modification is not supported by element interfaces;
                       this allows to keep at least some parts of some of fragments.
-        """
-        if max_len == 0:
-            self._parts.clear()
-            return
-        req_delta = len(self) - max_len
-        if req_delta <= 0:
-            return
-        if len(self._parts[0]) > max_len:
-            self._parts = deque[pt.IRenderable]([self._parts.popleft()])
-
-        disposables = []
-        adaptives = []
-        fragments = []
 
-        for part in self._parts:
-            if isinstance(part, _DC):
-                disposables.append(part)
-            elif isinstance(part, _AF):
-                adaptives.append(part)
-                fragments.append(part)
-            elif isinstance(part, pt.Fragment):
-                fragments.append(part)
+        All the removals and truncations are planned first, and then applied to the
+        parts in one pass.
 
-        cur_pack_lvl = 1
-
-        while (req_delta := len(self) - max_len) > 0:
-            if max_purge := sum(map(len, disposables)):
-                self._purge(disposables, req_delta, max_purge)
-                self._debug_compress_level("I")
-                disposables.clear()
-                continue
-
-            if cur_pack_lvl < _AF.COLLAPSE_MAX_LVL and sum(
-                map(lambda af: af.delta_collapse(cur_pack_lvl), adaptives)
-            ):
-                self._collapse(adaptives, cur_pack_lvl)
-                self._debug_compress_level(f"II ({cur_pack_lvl})")
-                cur_pack_lvl += 1
-                continue
-
-            if max_shrink := sum(map(_AF.delta_shrink, adaptives)):
-                self._shrink(adaptives, req_delta - max_shrink)
-                self._debug_compress_level("III")
-                adaptives.clear()
-                continue
+        :return: Applied levels in order, with the parts affected by each of them.
+        """
+        if not self._parts or (max_len > 0 and len(self) <= max_len):
+            return []
+        plan = self._plan(max_len)
+
+        strings, collapse_lvls = plan.strings, plan.collapse_lvls
+        for part in plan.parts:
+            if (string := strings.get(id(part))) is not None:
+                part._string = string
+            if (lvl := collapse_lvls.get(id(part))) is not None:
+                part._collapse_lvl = lvl
+        self._parts = deque[pt.IRenderable](
+            p for pos, p in enumerate(plan.parts) if pos not in plan.removed
+        )
+        return plan.steps
+
+    def _plan(self, max_len: int) -> _CompressionPlan:
+        if max_len == 0:
+            plan = _CompressionPlan([], log=True)
+            plan.add_step("eviscerate", removed=self._parts)
+            return plan
+        if len(self._parts) > 1 and len(self._parts[0]) > max_len:
+            plan = _CompressionPlan([self._parts[0]], log=True)
+            plan.add_step("eviscerate", removed=itertools.islice(self._parts, 1, None))
+        else:
+            plan = _CompressionPlan(self._parts, log=True)
+        plan.run(max_len)
+        return plan
+
+    def get_schedule(self) -> CompressionSchedule:
+        """Precompute the compression of the parts in their current state for all widths."""
+        return CompressionSchedule(self._parts)
+
+
+class CompressionSchedule:
+    """
+    Compression of the parts worked out for all widths at once. Every level
+    except the last one is fully applied in advance, which yields the widths
+    at which the levels kick in; compressing to ``max_len`` then resumes from
+    the last level state which is still wider than that, so that only the
+    level in effect (if any) is computed. The parts are never modified, the
+    results get copies of the fragments that differ from the originals.
+
+    >>> schedule = compressor.get_schedule()
+    >>> for pane_width in pane_widths:
+    >>>     echo(schedule.materialize(pane_width))
+
+    The parts must not be changed while the schedule is in use.
+    """
+
+    def __init__(self, parts: t.Iterable[pt.IRenderable]):
+        self._parts = [*parts]
+        self._first_schedule: CompressionSchedule | None = None
+
+        plan = _CompressionPlan(self._parts)
+        self._states = [plan.copy()]
+        """ Level states with all the preceding levels fully applied, widest first. """
+        while plan.apply_next_level(plan.total_len + 1, 0):
+            self._states.append(plan.copy())
+        self._state_keys = [-state.total_len for state in self._states]  # for bisect
+        self._levels = [(step.level, step.sublevel) for step in plan.steps]
+
+    def __len__(self) -> int:
+        return self._states[0].total_len
 
-            if max_chop := sum(map(len, fragments)):
-                self._chop(fragments, req_delta, max_chop)
-                self._debug_compress_level("IV")
-                fragments.clear()
+    @property
+    def breakpoints(self) -> list[tuple[str, int, int]]:
+        """
+        :return: ``(level, sublevel, max_len)`` for each level, widest first, where
+                 ``max_len`` is the largest width at which the level gets applied.
+                 Below the length of the first part only the latter is kept, and it
+                 is compressed on its own.
+        """
+        result = []
+        first_len = len(self._parts[0]) if len(self._parts) > 1 else 0
+        for (level, sublevel), state in zip(self._levels, self._states):
+            if (max_len := state.total_len - 1) >= first_len:
+                result.append((level, sublevel, max_len))
+        if first_len > 1:
+            result.append(("eviscerate", 0, first_len - 1))
+            result += self._get_first_schedule().breakpoints
+        return result
+
+    def get_steps(self, max_len: int) -> list[CompressionStep]:
+        """:return: Levels that `CompositeCompressor.compress()` would apply."""
+        return self._plan(max_len).steps
+
+    def materialize(self, max_len: int) -> pt.Composite:
+        """
+        :return: Parts compressed to fit into ``max_len``; the unchanged ones are
+                 shared with the schedule.
+        """
+        plan = self._plan(max_len)
+        strings, collapse_lvls = plan.strings, plan.collapse_lvls
+        copies: dict[int, pt.IRenderable] = {}  # shared instances stay shared
+        parts = []
+        for pos, part in enumerate(plan.parts):
+            if pos in plan.removed:
                 continue
-
-            self._eviscerate(max_len)
-            self._debug_compress_level("V")
-            break  # от греха
-
-    def _debug_compress_level(self, level: str):
-        logger.debug(f"Level {level} compression applied: length {len(self)}")
-
-    def _purge(self, disposables: list[_DC], req_delta: int, max_purge: int):
-        if req_delta - max_purge > 0:
-            for d in disposables:
-                self._parts.remove(d)
-            return
-        for d in sorted(disposables, key=lambda D: -len(D)):
-            if req_delta <= 0:
-                break
-            req_delta -= len(d)
-            self._parts.remove(d)
-
-    def _collapse(self, adaptives: list[_AF], lvl: int):
-        [a.collapse(lvl) for a in adaptives]
-
-    def _shrink(self, adaptives: list[_AF], req_remain: int):
-        [a.shrink() for a in adaptives]
-
-    def _chop(self, fragments: list[pt.Fragment], req_delta: int, delta_chop: int):
-        if req_delta - delta_chop > 0:
-            for f in fragments:
-                self._parts.remove(f)
-            return
-        chop_ratio = req_delta / len(fragments)
-        for f in fragments:
-            if req_delta <= 0:
-                break
-            req_delta -= (chop := ceil(len(f) * chop_ratio))
-            if chop >= len(f):
-                self._parts.remove(f)
-            else:
-                f._string = f._string[:-chop]
-
-    def _eviscerate(self, max_len: int):
-        while len(self) > max_len and len(self._parts):
-            self._parts.pop()
+            if (part_copy := copies.get(part_id := id(part))) is not None:
+                part = part_copy
+            elif part_id in strings or part_id in collapse_lvls:
+                part = copies[part_id] = copy.copy(part)
+                if (string := strings.get(part_id)) is not None:
+                    part._string = string
+                if (lvl := collapse_lvls.get(part_id)) is not None:
+                    part._collapse_lvl = lvl
+            parts.append(part)
+        return pt.Composite(*parts)
+
+    def _plan(self, max_len: int) -> _CompressionPlan:
+        if not self._parts or (max_len > 0 and len(self) <= max_len):
+            return self._states[0].copy()
+        if max_len == 0:
+            plan = _CompressionPlan([])
+            plan.add_step("eviscerate", removed=self._parts)
+            return plan
+        if len(self._parts) > 1 and len(self._parts[0]) > max_len:
+            plan = self._get_first_schedule()._plan(max_len)
+            step = CompressionStep("eviscerate", 0, len(self._parts[0]), self._parts[1:])
+            plan.steps.insert(0, step)
+            return plan
+
+        # the last state which is still too wide, the preceding levels apply fully:
+        plan = self._states[bisect.bisect_left(self._state_keys, -max_len) - 1].copy()
+        plan.run(max_len)
+        return plan
+
+    def _get_first_schedule(self) -> CompressionSchedule:
+        if self._first_schedule is None:
+            self._first_schedule = CompressionSchedule(self._parts[:1])
+        return self._first_schedule
 
 
 def format_attrs(*o: object, keep_classname=True, level=0, flat=False, truncate: int = None) -> str:
@@ -0,0 +1,101 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
+from __future__ import annotations
+
+import math
+import time
+
+import pytermor as pt
+
+
+class RateEstimator:
+    """
+    Throughput estimation over a cumulative counter. Updates are merged into
+    samples at least ``min_sample_sec`` long, and the per-sample rates are
+    combined into a time-weighted EWMA: the weight of a sample depends on its
+    duration relative to ``half_life_sec`` rather than on the amount of updates,
+    so bursts of completions do not skew the estimate. A stall decays the rate
+    towards zero even without any updates.
+
+    >>> est = RateEstimator()
+    >>> est.add(50)
+    >>> est.get_rate(), est.get_eta(total=1000)
+    (None, None)
+    """
+
+    def __init__(self, half_life_sec: float = 10.0, min_sample_sec: float = 0.25):
+        self._decay_ns = half_life_sec * 1e9 / math.log(2)
+        self._min_sample_ns = int(min_sample_sec * 1e9)
+
+        self._done = 0
+        self._sample_done = 0
+        self._sample_ts = time.monotonic_ns()
+        self._rate: float | None = None
+
+    @property
+    def done(self) -> float:
+        return self._done
+
+    def add(self, amount: float = 1, now_ns: int = None):
+        self.update(self._done + amount, now_ns)
+
+    def update(self, done: float, now_ns: int = None):
+        """Set the counter to ``done``; a decrease is treated as a restart."""
+        if done < self._done:
+            self._sample_done = done
+        self._done = done
+
+        now_ns = now_ns or time.monotonic_ns()
+        if (sample_ns := now_ns - self._sample_ts) < self._min_sample_ns:
+            return
+        self._rate = self._blend(self._rate, self._get_sample_rate(sample_ns), sample_ns)
+        self._sample_done = done
+        self._sample_ts = now_ns
+
+    def get_rate(self, now_ns: int = None) -> float | None:
+        """
+        :return: Amount per second, or *None* if there is not enough data yet.
+        """
+        now_ns = now_ns or time.monotonic_ns()
+        if (sample_ns := now_ns - self._sample_ts) < self._min_sample_ns:
+            return self._rate
+        # the sample in progress matters if it is long enough, e.g. for stalls:
+        return self._blend(self._rate, self._get_sample_rate(sample_ns), sample_ns)
+
+    def get_eta(self, total: float, now_ns: int = None) -> float | None:
+        """
+        :return: Seconds left until the counter reaches ``total``, or *None*
+                 if the rate is unknown or zero.
+        """
+        if not (rate := self.get_rate(now_ns)):
+            return None
+        return max(0.0, total - self._done) / rate
+
+    def _get_sample_rate(self, sample_ns: int) -> float:
+        return (self._done - self._sample_done) * 1e9 / sample_ns
+
+    def _blend(self, rate: float | None, sample_rate: float, sample_ns: int) -> float:
+        if rate is None:
+            return sample_rate
+        alpha = 1 - math.exp(-sample_ns / self._decay_ns)
+        return rate + alpha * (sample_rate - rate)
+
+
+def format_rate(rate: float | None) -> str:
+    if rate is None:
+        return "--/s"
+    if rate >= 1000:
+        return pt.format_si(rate, "/s")
+    if rate >= 1:
+        return f"{rate:.3g}/s"
+    if rate > 0:
+        return pt.format_time_delta(1 / rate, 6) + "/it"
+    return "0/s"
+
+
+def format_eta(eta_sec: float | None) -> str:
+    if eta_sec is None:
+        return "ETA --"
+    return "ETA " + pt.format_time_delta(eta_sec, 6)
@@ -2,7 +2,12 @@
 #  es7s/commons
 #  (c) 2023 A. Shavykin <0.delameter@gmail.com>
 # ------------------------------------------------------------------------------
+import os
+import shutil
+import signal
 import sys
+import threading
+import time
 import typing as t
 from contextlib import contextmanager
 
@@ -37,6 +42,76 @@ def terminal_state(
         tstate.restore_state()
 
 
+class TerminalGeometry:
+    """
+    Process-wide terminal size cache. The size is queried once and then kept
+    until a ``SIGWINCH`` arrives; the handler is installed on the first query
+    and calls the previously installed one as well. Where signal handlers are
+    unavailable (non-main thread, no ``SIGWINCH`` on the platform), the size
+    is re-queried at most once per `POLL_INTERVAL_SEC`. Anyway, the cached
+    value is never older than `MAX_AGE_SEC`, in case the handler gets replaced.
+    """
+
+    POLL_INTERVAL_SEC = 0.5
+    MAX_AGE_SEC = 5
+
+    def __init__(self):
+        self._size: os.terminal_size | None = None
+        self._query_ts = 0
+        self._max_age_ns = 0
+        self._handler_installed: bool | None = None
+        self._prev_handler: t.Callable | int | None = None
+
+    def get_size(self) -> os.terminal_size:
+        size = self._size
+        if size is None or time.monotonic_ns() - self._query_ts >= self._max_age_ns:
+            size = self._query()
+        return size
+
+    def get_width(self, pad: int = 2) -> int:
+        return self.get_size().columns - pad
+
+    def invalidate(self):
+        self._size = None
+
+    def _query(self) -> os.terminal_size:
+        if self._handler_installed is None:
+            self._handler_installed = self._install_handler()
+        max_age_sec = self.MAX_AGE_SEC if self._handler_installed else self.POLL_INTERVAL_SEC
+        self._max_age_ns = int(max_age_sec * 1e9)
+
+        self._size = size = shutil.get_terminal_size()
+        self._query_ts = time.monotonic_ns()
+        return size
+
+    def _install_handler(self) -> bool:
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        try:
+            self._prev_handler = signal.signal(signal.SIGWINCH, self._on_sigwinch)
+        except (AttributeError, ValueError, OSError) as e:
+            logger.debug(f"TGM: SIGWINCH handler unavailable, polling instead: {e}")
+            return False
+        return True
+
+    def _on_sigwinch(self, signum, frame):
+        self._size = None
+        if callable(self._prev_handler):
+            self._prev_handler(signum, frame)
+
+
+_geometry = TerminalGeometry()
+
+
+def get_terminal_geometry() -> TerminalGeometry:
+    return _geometry
+
+
+def get_terminal_width(pad: int = 2) -> int:
+    """Cached counterpart of `pt.get_terminal_width()`."""
+    return _geometry.get_width(pad)
+
+
 class TerminalState:
     def __init__(self, io: t.IO = None):
         self._io = io or sys.stdout
@@ -190,6 +265,9 @@ class TerminalState:
     def _echo(self, sequence: pt.ISequence):
         self._io.write(sequence.assemble())
 
+    def get_terminal_size(self) -> os.terminal_size:
+        return _geometry.get_size()
+
     def _is_allowed_to_send_esq(self) -> bool:
         if self._force_esq is not None:
             return self._force_esq
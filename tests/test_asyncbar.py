@@ -0,0 +1,58 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
+from __future__ import annotations
+
+import asyncio
+import io
+
+import pytermor as pt
+import pytest
+
+from es7s_commons.asyncbar import AsyncProgressBar
+
+
+async def _arange(n: int):
+    for i in range(n):
+        yield i
+        await asyncio.sleep(0)
+
+
+def _make_pbar(output: io.StringIO) -> AsyncProgressBar:
+    return AsyncProgressBar(pt.NoopRenderer(), output, pt.cv.BLUE)
+
+
+class TestAsyncProgressBar:
+    def test_atrack(self):
+        output = io.StringIO()
+
+        async def main() -> list[int]:
+            async with _make_pbar(output) as pbar:
+                items = [item async for item in pbar.atrack(_arange(100), steps_amount=100)]
+                assert pbar._step_num == 100
+            return items
+
+        assert asyncio.run(main()) == [*range(100)]
+        assert output.getvalue().endswith("\n")
+
+    def test_aclose_cleans_up_after_render_loop_failure(self):
+        pbar = _make_pbar(io.StringIO())
+
+        def fail(*_):
+            raise RuntimeError("render failed")
+
+        async def main():
+            pbar._render_frame = fail
+            pbar.start()
+            await asyncio.sleep(0.01)
+            await pbar.aclose()
+
+        with pytest.raises(RuntimeError, match="render failed"):
+            asyncio.run(main())
+        assert pbar._io is None
+        assert pbar._writer._shutdown
+
+    def test_background_is_rejected(self):
+        with pytest.raises(ValueError):
+            AsyncProgressBar(pt.NoopRenderer(), io.StringIO(), pt.cv.BLUE, background=True)
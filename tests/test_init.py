@@ -0,0 +1,36 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
+from __future__ import annotations
+
+import importlib
+import json
+import subprocess
+import sys
+
+import pytest
+
+import es7s_commons
+from bench.startup import HEAVY_MODULES
+
+
+def test_import_does_not_load_heavy_modules():
+    code = "import es7s_commons, json, sys; print(json.dumps([*sys.modules]))"
+    output = subprocess.check_output([sys.executable, "-c", code], encoding="utf8")
+    loaded = set(json.loads(output))
+    assert not loaded.intersection(HEAVY_MODULES)
+
+
+@pytest.mark.parametrize("name", es7s_commons.__all__)
+def test_public_name_resolves(name: str):
+    if (module_name := es7s_commons._LAZY_ATTRS.get(name)) is None:
+        assert name in vars(es7s_commons)
+        return
+    module = importlib.import_module(f"es7s_commons.{module_name}")
+    assert es7s_commons.__getattr__(name) is getattr(module, name)
+
+
+def test_unknown_name():
+    with pytest.raises(AttributeError):
+        es7s_commons.__getattr__("nonexistent")
@@ -0,0 +1,53 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
+from __future__ import annotations
+
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytermor as pt
+
+from es7s_commons.multibar import MultiProgressBar
+
+
+def _make_mbar(output: io.StringIO, **kwargs) -> MultiProgressBar:
+    return MultiProgressBar(pt.SgrRenderer(pt.OutputMode.TRUE_COLOR), output, pt.cv.BLUE, **kwargs)
+
+
+class TestMultiProgressBar:
+    def test_unchanged_lines_are_skipped(self):
+        mbar = _make_mbar(io.StringIO())
+        mbar._drawn_lines = ["first", "second", "third"]
+        output = "".join(mbar._diff_lines(["first", "changed", "third"]))
+        assert "changed" in output
+        assert "first" not in output and "third" not in output
+        assert mbar._drawn_lines == ["first", "changed", "third"]
+
+    def test_leftover_lines_are_cleared(self):
+        mbar = _make_mbar(io.StringIO())
+        mbar._drawn_lines = ["first", "second", "third"]
+        output = "".join(mbar._diff_lines(["first", "second"]))
+        assert "first" not in output and "second" not in output
+        assert output.endswith(mbar.CSI_ED0 + pt.make_move_cursor_up(1).assemble())
+
+    def test_identical_frame_writes_no_lines(self):
+        mbar = _make_mbar(io.StringIO())
+        mbar._drawn_lines = ["first", "second"]
+        output = "".join(mbar._diff_lines(["first", "second"]))
+        assert mbar.OUT_START not in output
+
+    def test_background_workers(self):
+        output = io.StringIO()
+        mbar = _make_mbar(output, tasks_amount=4, background=True)
+
+        def work(num: int):
+            with mbar.add_task(f"task {num}", steps_amount=10) as task:
+                for _ in range(10):
+                    task.next_step()
+
+        with mbar, ThreadPoolExecutor(4) as executor:
+            [*executor.map(work, range(4))]
+        assert mbar._task_num == 4
+        assert "Total" in output.getvalue()
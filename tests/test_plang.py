@@ -0,0 +1,186 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
+from __future__ import annotations
+
+import pickle
+import random
+import subprocess
+import sys
+
+import pytermor as pt
+import pytest
+
+from es7s_commons.plang import PLangBreakdown, PLangClassifier, PLangColor, PLangColorGrid
+from es7s_commons.scale import FULL_BLOCK
+
+
+class TestPLangColorRegistry:
+    def test_instances_are_created_on_demand(self):
+        code = (
+            "from es7s_commons.plang import PLangColor as C; "
+            "C.find_by_name('Python'); print(len(C._instances)); "
+            "C._ensure_loaded(); print(len(C._instances))"
+        )
+        output = subprocess.check_output([sys.executable, "-c", code], encoding="utf8")
+        assert output.split() == ["1", str(len(PLangColor.MAP))]
+
+    def test_instance_is_created_once(self):
+        assert PLangColor.find_by_name("Rust") is PLangColor.find_by_name("Rust")
+
+
+class TestPLangColorFind:
+    # fmt: off
+    @pytest.mark.parametrize("name, expected", [
+        ("C++",         "C++"),
+        ("c++",         "C++"),
+        ("cplusplus",   "C++"),
+        ("cpp",         "C++"),
+        ("csharp",      "C#"),
+        ("cs",          "C#"),
+        ("objectivec",  "Objective-C"),
+        ("JAVASCRIPT",  "JavaScript"),
+        ("js",          "JavaScript"),
+        ("F*",          "F*"),
+        ("fstar",       "F*"),
+    ])
+    # fmt: on
+    def test_find(self, name: str, expected: str):
+        assert PLangColor.find(name).name == expected
+
+    def test_not_found(self):
+        assert PLangColor.find("nonexistent") is None
+        with pytest.raises(LookupError):
+            PLangColor.find_by_name("nonexistent")
+
+    def test_every_name_and_alias_resolves(self):
+        for name in PLangColor.MAP.keys():
+            assert PLangColor.find(name).name == name
+        for alias, name in PLangColor.ALIAS_MAP.items():
+            assert PLangColor.find(alias).name == name
+
+
+class TestPLangClassifier:
+    # fmt: off
+    PATHS = {
+        "src/main.py":       "Python",
+        "SRC/MAIN.PY":       "Python",
+        "Makefile":          "Makefile",
+        "docker/Dockerfile": "Dockerfile",
+        "types/index.d.ts":  "TypeScript",
+        ".bashrc":           "Shell",
+        "README":            None,
+        "archive.tar.gz":    None,
+        "data.unknownext":   None,
+    }
+    # fmt: on
+
+    @pytest.mark.parametrize("path, expected", PATHS.items())
+    def test_classify(self, path: str, expected: str | None):
+        color = PLangClassifier().classify(path)
+        assert (color.name if color else None) == expected
+
+    def test_classify_many_keeps_order(self):
+        paths = [*self.PATHS.keys()] * 3
+        colors = PLangClassifier().classify_many(paths)
+        assert [c.name if c else None for c in colors] == [*self.PATHS.values()] * 3
+
+    def test_classify_many_matches_classify(self):
+        paths = [
+            f"dir{i}/file{i}{ext}" for i, ext in enumerate([".py", ".rs", ".c", ".h", ""] * 20)
+        ]
+        assert PLangClassifier().classify_many(paths) == [*map(PLangClassifier().classify, paths)]
+
+
+def _dist_sq(a: int, b: int) -> int:
+    return sum(((a >> shift & 0xFF) - (b >> shift & 0xFF)) ** 2 for shift in (16, 8, 0))
+
+
+def _brute_force_dist_sq(value: int) -> int:
+    return min(_dist_sq(value, v) for v in PLangColor.MAP.values())
+
+
+class TestPLangColorGrid:
+    VALUES = [0x000000, 0xFFFFFF, 0x808080, *random.Random(7).sample(range(0x1000000), 300)]
+
+    def test_find_closest(self):
+        grid = PLangColorGrid()
+        for value in self.VALUES:
+            closest = grid.find_closest(value)
+            assert _dist_sq(value, PLangColor.MAP[closest.name]) == _brute_force_dist_sq(value)
+
+    def test_find_closest_many(self):
+        closest = PLangColorGrid().find_closest_many(self.VALUES)
+        for value, color in zip(self.VALUES, closest):
+            assert _dist_sq(value, PLangColor.MAP[color.name]) == _brute_force_dist_sq(value)
+
+    def test_find_closest_many_without_numpy(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "numpy", None)
+        grid = PLangColorGrid()
+        assert grid.find_closest_many(self.VALUES) == [*map(grid.find_closest, self.VALUES)]
+
+    def test_approximate_is_sorted(self):
+        results = PLangColorGrid().approximate(0x3572A5, max_results=5)
+        assert results[0].color.name == "Python"
+        assert [r.distance for r in results] == sorted(r.distance for r in results)
+
+
+def _make_breakdown(*records: tuple[str, int]) -> PLangBreakdown:
+    return PLangBreakdown().feed(records)
+
+
+class TestPLangBreakdown:
+    RECORDS = [("a.py", 600), ("b.py", 300), ("c.rs", 250), ("d.c", 90), ("README", 10)]
+
+    def test_shares(self):
+        breakdown = _make_breakdown(*self.RECORDS)
+        assert breakdown.total_size == 1250
+        assert breakdown.file_count == 5
+        assert breakdown.get_shares() == [
+            ("Python", 900, 0.72),
+            ("Rust", 250, 0.2),
+            ("C", 90, 0.072),
+            (None, 10, 0.008),
+        ]
+
+    def test_merge_and_add(self):
+        left, right = _make_breakdown(*self.RECORDS[:2]), _make_breakdown(*self.RECORDS[2:])
+        expected = _make_breakdown(*self.RECORDS).get_shares()
+        assert (left + right).get_shares() == expected
+        assert left.total_size == 900  # not modified by +
+        assert left.merge(right).get_shares() == expected
+
+    def test_pickle(self):
+        breakdown = _make_breakdown(*self.RECORDS)
+        restored = pickle.loads(pickle.dumps(breakdown))
+        assert restored.get_shares() == breakdown.get_shares()
+        assert restored.file_count == breakdown.file_count
+        restored.add("e.py", 100)
+        assert restored.total_size == breakdown.total_size + 100
+
+    @pytest.mark.parametrize("width", [1, 3, 7, 10, 40, 99])
+    def test_make_bar_width(self, width: int):
+        bar = _make_breakdown(*self.RECORDS).make_bar(width)
+        assert bar.raw() == FULL_BLOCK * width
+
+    def test_make_bar_largest_remainder(self):
+        # 72% / 20% / 7.2% / 0.8% of 10 cells: 7 + 2 + 0 + 0 plus one cell
+        # for the largest remainder (C, 0.72)
+        bar = _make_breakdown(*self.RECORDS).make_bar(10)
+        assert [len(part) for part in bar._fragments] == [7, 2, 1]
+
+
+class TestPLangColorSequenceCache:
+    @pytest.mark.parametrize("target", [pt.ColorTarget.FG, pt.ColorTarget.BG])
+    @pytest.mark.parametrize("upper_bound", [None, pt.Color256, pt.Color16])
+    def test_to_sgr(self, target: pt.ColorTarget, upper_bound: type | None):
+        color = PLangColor.find("Python")
+        expected = pt.ColorRGB.to_sgr(color, target, upper_bound)
+        assert color.to_sgr(target, upper_bound) == expected
+        assert color.to_sgr(target, upper_bound) is color.to_sgr(target, upper_bound)
+        assert color.to_sgr_str(target, upper_bound) == expected.assemble()
+
+    def test_to_tmux(self):
+        color = PLangColor.find("Python")
+        assert color.to_tmux(pt.ColorTarget.BG) == pt.ColorRGB.to_tmux(color, pt.ColorTarget.BG)
@@ -0,0 +1,354 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
+from __future__ import annotations
+
+import io
+import json
+import math
+import random
+import re
+import threading
+import time
+import typing as t
+
+import pytermor as pt
+import pytest
+
+from es7s_commons.progressbar import _CellDiffer, _FrameGovernor, JsonProgressBar, ProgressBar
+from es7s_commons.scale import FULL_BLOCK, get_partial_hblock
+
+
+class TestProgressBarTrack:
+    def test_pipe_output(self):
+        output = io.StringIO()
+        pbar = ProgressBar(pt.NoopRenderer(), output, pt.cv.BLUE)
+        assert sum(pbar.track(range(1000))) == sum(range(1000))
+        assert output.getvalue().splitlines()[-1] == "ProgressBar [1000/1000] ..."
+        assert ProgressBar.BORDER_LEFT_CHAR not in output.getvalue()
+
+    def test_terminal_output(self):
+        output = io.StringIO()
+        output.isatty = lambda: True
+        pbar = ProgressBar(pt.NoopRenderer(), output, pt.cv.BLUE)
+        for _ in pbar.track(range(1000)):
+            pass
+        assert ProgressBar.BORDER_LEFT_CHAR in output.getvalue()
+
+    def test_break_keeps_exact_count(self):
+        pbar = ProgressBar(pt.NoopRenderer(), io.StringIO(), pt.cv.BLUE)
+        for item in pbar.track(range(1000)):
+            if item == 499:
+                break
+        assert pbar._step_num == 500
+
+    def test_json_records(self):
+        output = io.StringIO()
+        pbar = JsonProgressBar(output)
+        for _ in pbar.track(range(1000)):
+            pass
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert len(records) >= 2
+        assert records[-1]["step"] == 1000
+        assert not records[-1]["final"]
+
+
+class TestJsonProgressBar:
+    def test_final_record_is_complete(self):
+        output = io.StringIO()
+        with JsonProgressBar(output, steps_amount=100) as pbar:
+            for _ in range(100):
+                pbar.next_step()
+        record = json.loads(output.getvalue().splitlines()[-1])
+        assert record["final"]
+        assert record["ratio"] == 1.0
+
+    def test_unthrottled(self):
+        output = io.StringIO()
+        with JsonProgressBar(output, steps_amount=10, min_interval_sec=0) as pbar:
+            for _ in range(10):
+                pbar.next_step()
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert [r["step"] for r in records[:-1]] == list(range(1, 11))
+
+    def test_invalid_interval(self):
+        with pytest.raises(ValueError):
+            JsonProgressBar(io.StringIO(), min_interval_sec=-1)
+        with pytest.raises(ValueError):
+            JsonProgressBar(io.StringIO(), min_interval_sec=0, background=True)
+
+    def test_fd_output(self, tmp_path):
+        path = tmp_path / "progress.jsonl"
+        with open(path, "w") as f:
+            with JsonProgressBar(f.fileno(), steps_amount=3) as pbar:
+                for _ in range(3):
+                    pbar.next_step()
+            assert not f.closed
+        record = json.loads(path.read_text().splitlines()[-1])
+        assert record["step"] == 3 and record["final"]
+
+
+class TestFrameGovernor:
+    def test_frame_is_due_after_interval(self):
+        governor = _FrameGovernor(max_frame_rate=10, min_frame_rate=1, max_load=0.05)
+        assert governor.is_due(0)
+        governor.on_frame_rendered(0, 1000)
+        assert not governor.is_due(50_000_000)
+        assert governor.is_due(100_000_000)
+        assert governor.dropped_frames == 1
+
+    def test_interval_is_stretched_by_frame_cost(self):
+        governor = _FrameGovernor(max_frame_rate=10, min_frame_rate=1, max_load=0.05)
+        governor.on_frame_rendered(0, 20_000_000)  # 20ms per frame -> 400ms interval
+        assert governor.interval_ns == 400_000_000
+        governor = _FrameGovernor(max_frame_rate=10, min_frame_rate=1, max_load=0.05)
+        governor.on_frame_rendered(0, 500_000_000)
+        assert governor.effective_fps == 1
+
+
+def _make_tty_output() -> io.StringIO:
+    output = io.StringIO()
+    output.isatty = lambda: True
+    return output
+
+
+class TestProgressBarBackground:
+    def test_ticker_renders_frames(self):
+        output = _make_tty_output()
+        pbar = ProgressBar(pt.NoopRenderer(), output, pt.cv.BLUE, steps_amount=3, background=True)
+        ticker = pbar._ticker
+        for _ in range(3):
+            pbar.next_step()
+        time.sleep(3 * pbar.frame_interval_sec)
+        pbar.close()
+        assert not ticker.is_alive()
+        assert "[3/3]" in output.getvalue()
+
+    def test_steps_do_not_render(self):
+        pbar = ProgressBar(pt.NoopRenderer(), _make_tty_output(), pt.cv.BLUE, background=True)
+        ticker, render_frame, render_threads = pbar._ticker, pbar._render_frame, set()
+
+        def _render_frame(*args):
+            render_threads.add(threading.current_thread())
+            render_frame(*args)
+
+        with pbar:
+            pbar._render_frame = _render_frame
+            for _ in range(100):
+                pbar.next_step()
+                pbar.render()
+            time.sleep(2 * pbar.frame_interval_sec)
+        assert render_threads == {ticker}
+
+
+def _render_reference(
+    pbar: ProgressBar,
+    icon_frame: int,
+    task_num: int,
+    ratio: float,
+    task_label: str,
+    step_num: str,
+    step_label: str,
+) -> str:
+    """Full frame render as it was before the frame templates."""
+    fmt = pbar.is_format_allowed
+    styles = pbar._styles
+    field_sep = pbar.FIELD_SEP
+    icon: str | pt.Fragment = " "
+    if fmt:
+        field_sep = f"{styles.DEFAULT.bg.to_sgr(pt.ColorTarget.BG)}{pbar.FIELD_SEP}"
+        icon = pt.Fragment((pbar.ICON, " ")[icon_frame % 2], styles.ICON)
+    task_state = [
+        pt.Fragment(f"{task_num:>{pbar._get_max_task_num_len()}d}", styles.TASK_NUM_CUR),
+        pt.Fragment(pbar.NUM_DELIM, styles.TASK_DELIM),
+        pt.Fragment(f"{pbar._get_max_task_num():<d}", styles.TASK_NUM_MAX),
+    ]
+    label_right_text = pt.fit(
+        step_label,
+        pbar._max_label_len - pbar.LABEL_PAD * 2 - len(task_label) - len(step_num),
+        "<",
+    )
+    labels = [task_label, pt.pad(pbar.LABEL_PAD), step_num, label_right_text]
+    if fmt:
+        labels = [
+            pt.Fragment(f"{task_label}{pt.pad(pbar.LABEL_PAD)}"),
+            pt.Fragment(f"{pt.SeqIndex.DIM}{step_num}"),
+            pt.Fragment(label_right_text),
+        ]
+    return pt.render(
+        pt.Composite(
+            field_sep,
+            icon,
+            field_sep,
+            *task_state,
+            field_sep,
+            *_render_reference_bar(pbar, ratio),
+            field_sep,
+            *labels,
+        ),
+        renderer=pbar._renderer,
+    )
+
+
+def _render_reference_bar(pbar: ProgressBar, ratio: float) -> t.Iterable[str | pt.Fragment]:
+    filled_length = math.floor(ratio * pbar.BAR_WIDTH)
+    ratio_label = list(f"{100*ratio:>3.0f}%")
+    ratio_label_left_pos = (pbar.BAR_WIDTH - 4) // 2
+    ratio_label_perc_pos = ratio_label_left_pos + 3
+
+    if not pbar.is_format_allowed:
+        bar_chars = filled_length * FULL_BLOCK
+        bar_chars += get_partial_hblock(ratio - filled_length * pbar.BAR_WIDTH)
+        yield pbar.BORDER_LEFT_CHAR
+        yield pt.fit(bar_chars, pbar.BAR_WIDTH)
+        yield from ratio_label
+        return
+
+    bar_styles = [
+        pbar._renderer.render("\x00", pbar._styles.BAR_FILLED).split("\x00", 1)[0],
+        pt.SeqIndex.INVERSED.assemble(),
+    ]
+    label_styles = [pt.SeqIndex.BOLD.assemble(), pt.SeqIndex.DIM.assemble()]
+
+    cursor = 0
+    yield pt.Fragment(pbar.BORDER_LEFT_CHAR, pbar._styles.BAR_BORDER)
+    yield bar_styles.pop(0)
+    while cursor < pbar.BAR_WIDTH:
+        if cursor >= filled_length and bar_styles:
+            yield bar_styles.pop()
+        if cursor >= ratio_label_left_pos:
+            if len(label_styles) == 2:
+                yield label_styles.pop(0)
+            if cursor >= ratio_label_perc_pos and label_styles:
+                yield label_styles.pop()
+            if len(ratio_label):
+                cursor += 1
+                yield ratio_label.pop(0)
+                continue
+        cursor += 1
+        yield " "
+
+    if bar_styles:
+        yield bar_styles.pop()
+    yield pt.SeqIndex.INVERSED_OFF.assemble()
+    yield pt.Fragment(pbar.BORDER_RIGHT_CHAR, pbar._styles.BAR_BORDER)
+    yield pt.SeqIndex.BOLD_DIM_OFF.assemble()
+
+
+class TestFrameTemplate:
+    # fmt: off
+    @pytest.mark.parametrize("output_mode", [
+        pt.OutputMode.TRUE_COLOR,
+        pt.OutputMode.XTERM_256,
+        pt.OutputMode.XTERM_16,
+        pt.OutputMode.NO_ANSI,
+    ])
+    # fmt: on
+    @pytest.mark.parametrize("tasks_amount", [1, 9, 120])
+    def test_render_matches_reference(self, output_mode: pt.OutputMode, tasks_amount: int):
+        renderer = pt.SgrRenderer(output_mode)
+        pbar = ProgressBar(renderer, io.StringIO(), pt.cv.BLUE, tasks_amount=tasks_amount)
+        pbar._compute_max_label_len()
+        template = pbar._get_template()
+
+        for ratio in [0.0, 0.05, 0.2, 0.5, 0.999, 1.0]:
+            for icon_frame, task_num in enumerate({1, tasks_amount // 2 + 1, tasks_amount}):
+                for step_num in ["", "[5/10] ", "[12345/99999] "]:
+                    args = (icon_frame, task_num, ratio, "Task", step_num, "step label")
+                    assert template.render(*args) == _render_reference(pbar, *args)
+
+
+class _Screen:
+    """Single line terminal emulator: characters with SGR state, CHA and EL."""
+
+    SEQ_REGEX = re.compile(R"\x1b\[([\d;:]*)([mGK])")
+
+    def __init__(self):
+        self._differ = _CellDiffer()
+        self._state = _CellDiffer._DEFAULT_STATE
+        self.cells: list[tuple[str, tuple]] = []
+        self._cursor = 0
+
+    def feed(self, data: str):
+        pos = 0
+        for match in self.SEQ_REGEX.finditer(data):
+            self._write(data[pos : match.start()])
+            params, cmd = match.groups()
+            if cmd == "m":
+                self._state = self._differ._apply(self._state, match.group(0))
+            elif cmd == "G":
+                self._cursor = int(params or 1) - 1
+            elif params in ("", "0"):
+                del self.cells[self._cursor :]
+            pos = match.end()
+        self._write(data[pos:])
+
+    def _write(self, text: str):
+        assert "\x1b" not in text
+        for char in text:
+            while len(self.cells) <= self._cursor:
+                self.cells.append((" ", _CellDiffer._DEFAULT_STATE))
+            self.cells[self._cursor] = (char, self._state)
+            self._cursor += 1
+
+
+def _redraw(line: str) -> str:
+    return ProgressBar.OUT_START + line + ProgressBar.CSI_EL0 + ProgressBar.SGR_RESET
+
+
+class TestCellDiffer:
+    # fmt: off
+    SGRS = [
+        "\x1b[1m", "\x1b[2m", "\x1b[22m", "\x1b[7m", "\x1b[27m", "\x1b[0m", "\x1b[m",
+        "\x1b[31m", "\x1b[39m", "\x1b[44m", "\x1b[49m", "\x1b[38;5;12m", "\x1b[48;2;1;2;3m",
+        "\x1b[1;38;2;200;0;0m", "\x1b[53m",
+    ]
+    # fmt: on
+
+    def _make_line(self, rnd: random.Random) -> str:
+        parts = []
+        for _ in range(rnd.randint(0, 40)):
+            if rnd.random() < 0.2:
+                parts.append(rnd.choice(self.SGRS))
+            else:
+                parts.append(rnd.choice("ab █▏"))
+        return "".join(parts)
+
+    def test_random_lines(self):
+        rnd = random.Random(1)
+        differ = _CellDiffer()
+        screen = _Screen()
+        for _ in range(2000):
+            line = self._make_line(rnd)
+            expected = _Screen()
+            expected.feed(_redraw(line))
+            if (diff := differ.diff(line)) is None:
+                diff = _redraw(line)
+            screen.feed(diff)
+            assert screen.cells == expected.cells
+
+    def test_progress_bar_frames(self):
+        output = io.StringIO()
+        output.isatty = lambda: True
+        renderer = pt.SgrRenderer(pt.OutputMode.TRUE_COLOR)
+        pbar = ProgressBar(renderer, output, pt.cv.BLUE, steps_amount=300, cell_diff=True)
+        screen = _Screen()
+        expected = _Screen()
+        for step in range(300):
+            pbar.next_step(f"step {step % 7}" * (step % 3), render=False)
+            pbar._render_frame(time.monotonic_ns())
+            screen.feed(output.getvalue())
+            output.seek(0)
+            output.truncate()
+
+            line = pbar._template.render(
+                pbar._icon_frame,
+                pbar._task_num,
+                pbar._compute_task_progress(),
+                pbar._task_label,
+                pbar._format_step_num(),
+                pbar._step_label,
+            )
+            expected.feed(_redraw(line))
+            assert screen.cells == expected.cells
@@ -0,0 +1,124 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
+from __future__ import annotations
+
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytermor as pt
+import pytest
+
+from es7s_commons.progressbar import ProgressBar
+from es7s_commons.progresshub import (
+    ProgressHandle,
+    ProgressHub,
+    SharedProgressHandle,
+    SharedProgressHub,
+)
+
+TASKS = 8
+WORKERS = 4
+STEPS = 500
+
+
+def _make_pbar() -> ProgressBar:
+    return ProgressBar(pt.NoopRenderer(), io.StringIO(), pt.cv.BLUE)
+
+
+def _work(task_num: int) -> int:
+    handle = SharedProgressHub.get_worker_handle()
+    handle.init_steps(STEPS)
+    for _ in range(STEPS):
+        handle.next_step()
+    handle.next_task(f"task {task_num}")
+    return task_num
+
+
+@pytest.fixture
+def hub() -> SharedProgressHub:
+    hub = SharedProgressHub(_make_pbar(), WORKERS, tasks_amount=TASKS)
+    yield hub
+    hub.close()
+
+
+class TestSharedProgressHub:
+    def test_several_tasks_per_handle(self, hub: SharedProgressHub):
+        handle = hub.get_handle()
+        handle.init_steps(STEPS)
+        handle.next_step(amount=STEPS)
+        handle.next_task()
+        handle.init_steps(STEPS)
+        hub._sync()
+        assert hub._pbar._step_num == STEPS
+        assert hub._pbar._steps_amount == 2 * STEPS
+
+        handle.next_step(amount=STEPS)
+        handle.close()
+        hub._sync()
+        assert hub._pbar._step_num == hub._pbar._steps_amount == 2 * STEPS
+
+    def test_several_tasks_per_worker(self, hub: SharedProgressHub):
+        with ProcessPoolExecutor(
+            WORKERS,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=hub.init_worker,
+            initargs=hub.initargs,
+        ) as executor:
+            futures = [executor.submit(_work, task_num) for task_num in range(TASKS)]
+            assert len(hub.wait(futures)) == TASKS
+        hub._sync()
+        assert hub._pbar._task_num == TASKS
+        assert hub._pbar._step_num == hub._pbar._steps_amount == TASKS * STEPS
+
+    def test_task_and_step_labels(self, hub: SharedProgressHub):
+        handle = hub.get_handle()
+        handle.next_task("task")
+        handle.next_step("step")
+        hub._sync()
+        assert (hub._pbar._task_label, hub._pbar._step_label) == ("task", "step")
+
+        handle.next_step("другой шаг" * 10)
+        handle.close()
+        hub._sync()
+        assert hub._pbar._task_label == "task"
+        assert len(hub._pbar._step_label.encode("utf8")) <= SharedProgressHandle.LABEL_SIZE
+        assert hub._pbar._step_label == ("другой шаг" * 10)[: len(hub._pbar._step_label)]
+
+
+class TestProgressHub:
+    def test_threads_are_aggregated(self):
+        hub = ProgressHub(_make_pbar(), tasks_amount=TASKS, steps_amount=TASKS * STEPS)
+        handles = set()
+        handles_lock = threading.Lock()
+
+        def work(task_num: int):
+            handle = hub.get_handle()
+            with handles_lock:
+                handles.add(handle)
+            for _ in range(STEPS):
+                handle.next_step("step")
+            handle.next_task(f"task {task_num}")
+
+        with ThreadPoolExecutor(WORKERS) as executor:
+            futures = [executor.submit(work, task_num) for task_num in range(TASKS)]
+            assert len(hub.wait(futures)) == TASKS
+        hub._sync()
+        assert len(handles) <= WORKERS
+        assert hub._pbar._task_num == TASKS
+        assert hub._pbar._step_num == hub._pbar._steps_amount == TASKS * STEPS
+        assert hub._pbar.steps_done == TASKS * STEPS
+        assert hub._pbar._task_label.startswith("task ")
+        hub.close()
+
+    def test_last_label_wins(self):
+        hub = ProgressHub(_make_pbar())
+        first, second = ProgressHandle(), ProgressHandle()
+        hub._handles += [first, second]
+        second.next_step("older")
+        first.next_step("newer")
+        hub._sync()
+        assert hub._pbar._step_label == "newer"
@@ -0,0 +1,78 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
+from __future__ import annotations
+
+import pytermor as pt
+import pytest
+
+from es7s_commons.pt_ import AdaptiveFragment, CompositeCompressor, DisposableComposite
+
+
+def _make_shared_parts() -> list[pt.IRenderable]:
+    sep = pt.Fragment("|")
+    dc = DisposableComposite("  ")
+    af = AdaptiveFragment(3, " tag ")
+    return [af, dc, sep, pt.Fragment("alpha"), dc, sep, pt.Fragment("beta"), dc, sep, af]
+
+
+class TestCompositeCompressorSharedParts:
+    def test_shared_separator_and_adaptive(self):
+        sep = pt.Fragment(" | ")
+        af = AdaptiveFragment(2, "  hello  ")
+        words = [pt.Fragment("word") for _ in range(3)]
+        cc = CompositeCompressor(sep, af, words[0], af, words[1], af, words[2], af)
+        cc.compress(22)
+        assert cc.raw() == " |hewordhewordhewordhe"
+
+    def test_equal_fragments_removed_by_position(self):
+        # "ab" is chopped to "a" first, then the equal fragment after "XY" is
+        # removed -- not the chopped one, as deque.remove() used to do
+        parts = [
+            pt.Fragment("ab"),
+            pt.Text("XY"),
+            pt.Fragment("a"),
+            AdaptiveFragment(1, "  hi  "),
+            pt.Fragment("ab"),
+        ]
+        cc = CompositeCompressor(*parts)
+        cc.compress(6)
+        assert cc.raw() == "aXYhab"
+
+    # fmt: off
+    @pytest.mark.parametrize("max_len, expected", [
+        (0,  ""),
+        (3,  "tag"),
+        (6,  "|beta|"),
+        (9,  "|beta|tag"),
+        (14, "tal|beta|t"),
+        (17, "ta|alpha|beta|ta"),
+        (20, "tag |alpha|beta|tag "),
+        (24, " tag |alpha|beta  | tag "),
+        (28, " tag   |alpha  |beta  | tag "),
+        (30, " tag   |alpha  |beta  | tag "),
+    ])
+    # fmt: on
+    def test_compress(self, max_len: int, expected: str):
+        cc = CompositeCompressor(*_make_shared_parts())
+        cc.compress(max_len)
+        assert cc.raw() == expected
+
+    def test_schedule_matches_compress(self):
+        parts = _make_shared_parts()
+        schedule = CompositeCompressor(*parts).get_schedule()
+        for max_len in range(len(schedule) + 2):
+            cc = CompositeCompressor(*_make_shared_parts())
+            steps = cc.compress(max_len)
+            assert schedule.materialize(max_len).raw() == cc.raw()
+            assert [(s.level, s.length) for s in schedule.get_steps(max_len)] == [
+                (s.level, s.length) for s in steps
+            ]
+        assert "".join(p.raw() for p in parts) == " tag   |alpha  |beta  | tag "
+
+    def test_schedule_keeps_shared_copies_shared(self):
+        result = CompositeCompressor(*_make_shared_parts()).get_schedule().materialize(18)
+        assert result.raw() == "tag|alpha|beta|tag"
+        first, *_, last = result._parts
+        assert first is last
@@ -0,0 +1,81 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
+from __future__ import annotations
+
+import pytest
+
+from es7s_commons.rate import format_eta, format_rate, RateEstimator
+
+SEC = 1_000_000_000
+
+
+def _feed(est: RateEstimator, rate: float, duration_sec: float, start_ns: int, step_ns: int) -> int:
+    now = start_ns
+    while now < start_ns + duration_sec * SEC:
+        now += step_ns
+        est.add(rate * step_ns / SEC, now)
+    return now
+
+
+class TestRateEstimator:
+    def test_no_data(self):
+        est = RateEstimator()
+        assert est.get_rate() is None
+        assert est.get_eta(100) is None
+
+    def test_converges_to_steady_rate(self):
+        est = RateEstimator(half_life_sec=2)
+        start = est._sample_ts
+        now = _feed(est, 100, 30, start, SEC // 100)
+        assert est.get_rate(now) == pytest.approx(100, rel=1e-3)
+        assert est.get_eta(est.done + 500, now) == pytest.approx(5, rel=1e-3)
+
+    def test_follows_rate_change(self):
+        est = RateEstimator(half_life_sec=2)
+        now = _feed(est, 100, 30, est._sample_ts, SEC // 100)
+        now = _feed(est, 10, 2, now, SEC // 100)
+        assert 50 < est.get_rate(now) < 60  # one half-life later: halfway there
+        now = _feed(est, 10, 30, now, SEC // 100)
+        assert est.get_rate(now) == pytest.approx(10, rel=1e-3)
+
+    def test_stall_decays_rate(self):
+        est = RateEstimator(half_life_sec=2)
+        now = _feed(est, 100, 30, est._sample_ts, SEC // 100)
+        assert est.get_rate(now + 10 * SEC) < 10
+
+    def test_bursts_do_not_skew_rate(self):
+        est = RateEstimator(half_life_sec=2)
+        now = est._sample_ts
+        for _ in range(30):  # 100 items every second, all at once
+            now += SEC
+            for _ in range(100):
+                est.add(1, now)
+        assert est.get_rate(now) == pytest.approx(100, rel=1e-3)
+
+
+# fmt: off
+@pytest.mark.parametrize("eta, expected", [
+    (None,  "ETA --"),
+    (0,     "ETA 0s"),
+    (59,    "ETA 59.0s"),
+    (3600,  "ETA 1h 0m"),
+    (90000, "ETA 1d 1h"),
+])
+# fmt: on
+def test_format_eta(eta: float | None, expected: str):
+    assert format_eta(eta) == expected
+
+
+# fmt: off
+@pytest.mark.parametrize("rate, expected", [
+    (None,  "--/s"),
+    (0,     "0/s"),
+    (0.5,   "2.00s/it"),
+    (12.3,  "12.3/s"),
+    (4567,  "4.57 k/s"),
+])
+# fmt: on
+def test_format_rate(rate: float | None, expected: str):
+    assert format_rate(rate) == expected
@@ -0,0 +1,61 @@
+# ------------------------------------------------------------------------------
+#  es7s/commons
+#  (c) 2026 A. Shavykin <0.delameter@gmail.com>
+# ------------------------------------------------------------------------------
+from __future__ import annotations
+
+import os
+import shutil
+import signal
+import threading
+
+import pytest
+
+from es7s_commons.termstate import TerminalGeometry
+
+
+@pytest.fixture
+def queries(monkeypatch) -> list[os.terminal_size]:
+    result = []
+
+    def get_terminal_size(*_) -> os.terminal_size:
+        result.append(size := os.terminal_size((80 + len(result), 24)))
+        return size
+
+    monkeypatch.setattr(shutil, "get_terminal_size", get_terminal_size)
+    return result
+
+
+@pytest.fixture
+def sigwinch_handler():
+    handler = signal.getsignal(signal.SIGWINCH)
+    yield
+    signal.signal(signal.SIGWINCH, handler)
+
+
+@pytest.mark.usefixtures("sigwinch_handler")
+class TestTerminalGeometry:
+    def test_size_is_cached(self, queries: list):
+        geometry = TerminalGeometry()
+        assert geometry.get_width(pad=0) == geometry.get_width(pad=0) == 80
+        assert len(queries) == 1
+
+    def test_cache_is_dropped_on_sigwinch(self, queries: list):
+        prev_calls = []
+        signal.signal(signal.SIGWINCH, lambda *args: prev_calls.append(args))
+        geometry = TerminalGeometry()
+        assert geometry.get_width(pad=0) == 80
+
+        os.kill(os.getpid(), signal.SIGWINCH)
+        assert geometry.get_width(pad=0) == 81
+        assert geometry.get_width(pad=0) == 81
+        assert len(queries) == 2
+        assert len(prev_calls) == 1  # the previous handler is still called
+
+    def test_polling_without_handler(self, queries: list):
+        geometry = TerminalGeometry()
+        thread = threading.Thread(target=geometry.get_size)
+        thread.start()
+        thread.join()
+        assert geometry._handler_installed is False
+        assert geometry._max_age_ns == TerminalGeometry.POLL_INTERVAL_SEC * 1e9